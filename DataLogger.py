@@ -4,31 +4,118 @@ import csv
 import time
 import os
 
+from storage.columnar import ColumnWriter
+from storage.rowstore import RowStore
+from storage.segments import SegmentWriter
+from storage.wal import WalWriter
+
 class DataLogger:
 	
-	def __init__(self, save_file, save_dir="logs/", autosave_interval=None, autosave_file=None):
+	def __init__(self, save_file, save_dir="logs/", autosave_interval=None, autosave_file=None, incremental=False, fsync_policy="flush", columnar=False, chunk_rows=4096, memory_limit=None, wal=False, wal_commit_interval=0.1, wal_commit_bytes=64*1024, segments=False, segment_bytes=64*1024**2, segment_seconds=3600, compression="gzip"):
+		"""
+		- incremental: autosave keeps the autosave file open and only appends new rows.
+		  save_csv then finalizes (renames) that file instead of rewriting everything.
+		- fsync_policy (incremental only): "flush" (fsync each autosave), "close" (fsync on final save) or "never"
+		- columnar: rows are written to save_file as binary column chunks of chunk_rows rows
+		  (see storage/columnar.py) instead of being kept for a CSV. No autosave needed.
+		- memory_limit: bytes of in-memory rows before spilling them to disk (None = no ceiling)
+		- wal: every row is also appended to <save_file>.wal (storage/wal.py), group-committed
+		  every wal_commit_interval s or wal_commit_bytes. Committed on a manual save, removed after
+		  a successful final save; after a crash, rebuild the CSV with python -m tools.wal_recover
+		  (a log left by a crashed run is renamed <save_file>.wal.<date-time>, never overwritten).
+		- segments: rows are written to rotating CSV segments <stem>.NNNN.csv instead of save_file,
+		  rolled every segment_bytes or segment_seconds, closed segments compressed in the background
+		  ("gzip", "lzma" or None) and listed in <stem>.manifest.json (see storage/segments.py).
+		columnar and segments are exclusive, and neither keeps rows in memory: combining them,
+		or one of them with incremental, autosave or memory_limit, raises ValueError.
+		"""
+		
+		# Storage modes
+		if columnar and segments:
+			raise ValueError("Invalid storage: columnar and segments are exclusive")
+		if columnar or segments:
+			mode = "columnar" if columnar else "segments"
+			unused = [name for name, val in (("incremental", incremental), ("autosave_interval", autosave_interval), ("autosave_file", autosave_file), ("memory_limit", memory_limit)) if val]
+			if unused:
+				raise ValueError(f"Invalid storage: {', '.join(unused)} not used with {mode}")
 		
-		self.data = []
+		self.data = RowStore(memory_limit, os.path.join(save_dir, f"{save_file}.spill.ljcol"))
 		self.save_file = save_file
 		self.save_dir = save_dir
 		self.autosave_interval = autosave_interval
 		self.autosave_file = autosave_file
 		
 		self.last_save = time.time() if autosave_interval else None
+		
+		# Incremental autosave
+		if fsync_policy not in ("flush", "close", "never"):
+			raise ValueError(f"Invalid fsync_policy '{fsync_policy}'. Expected flush, close or never")
+		
+		self.incremental = incremental
+		self.fsync_policy = fsync_policy
+		self._af = None			# open autosave file
+		self._writer = None
+		self._flushed = 0		# number of rows already in the autosave file
+		
+		# Columnar chunk file
+		self.columnar = ColumnWriter(os.path.join(save_dir, save_file), chunk_rows) if columnar else None
+		
+		# Rotating compressed segments
+		self.segments = SegmentWriter(save_dir, os.path.splitext(save_file)[0], segment_bytes, segment_seconds, compression) if segments else None
+		
+		# Write-ahead log (crash safety, bounded loss)
+		self.wal = WalWriter(os.path.join(save_dir, f"{save_file}.wal"), wal_commit_interval, wal_commit_bytes) if wal else None
 	
 	
 	def log(self, data: dict):
 		""" 
-		Log data in a temp list.
+		Log data in a compact row store (schema fixed at the first row).
 		Data content is based on controller required inputs and outputs.
 		log is responsible of autosave mechanism
 		"""
 		
 		# Data parsing and storing
 		entry = data
+		
+		if self.wal is not None:
+			self.wal.append([entry])
+		
+		if self.columnar is not None:
+			self.columnar.append(entry)
+			return
+		
+		if self.segments is not None:
+			self.segments.append(entry)
+			return
+		
 		self.data.append(entry)
 		
-		# Autosave mechanisme
+		self._check_autosave()
+	
+	
+	def log_batch(self, rows):
+		"""Log several rows at once (autosave checked once per batch)"""
+		
+		if self.wal is not None:
+			self.wal.append(rows)
+		
+		if self.columnar is not None:
+			self.columnar.extend(rows)
+			return
+		
+		if self.segments is not None:
+			self.segments.extend(rows)
+			return
+		
+		for row in rows:
+			self.data.append(row)
+		
+		self._check_autosave()
+	
+	
+	def _check_autosave(self):
+		"""Autosave mechanisme"""
+		
 		if self.autosave_interval and self.autosave_file:
 			now = time.time()
 			if now - self.last_save >= self.autosave_interval:
@@ -42,7 +129,12 @@ class DataLogger:
 		if not self.data:
 			return
 		
-		keys = self.data[0].keys()
+		if self.incremental:
+			n = self._append(filename, self.fsync_policy == "flush")
+			print(f"[AUTOSAVE] {n} new rows appended -> {self.autosave_file}")
+			return
+		
+		keys = self.data.columns
 
 		with open(filename, "w", newline="") as f:
 			writer = csv.DictWriter(f, fieldnames=keys)
@@ -50,16 +142,66 @@ class DataLogger:
 			writer.writerows(self.data)
         
 		print(f"[AUTOSAVE] Periodic save done -> {self.autosave_file}")
+	
+	
+	def _append(self, filename, sync):
+		"""Appends rows not yet written to the (kept open) autosave file. Returns the number of rows written."""
+		
+		if self._af is None:
+			self._af = open(filename, "w", newline="")
+			self._writer = csv.DictWriter(self._af, fieldnames=self.data.columns)
+			self._writer.writeheader()
+			self._flushed = 0
+		
+		n = len(self.data) - self._flushed
+		self._writer.writerows(self.data.rows(self._flushed))
+		self._flushed += n
+		
+		self._af.flush()
+		if sync:
+			os.fsync(self._af.fileno())
+		
+		return n
 
 
-	def save_csv(self):
-		"""Explicit save (manual or final)"""
+	def save_csv(self, final=True):
+		"""
+		Explicit save: final (end of run) or manual (final=False, the run goes on).
+		Only the final save removes the write-ahead log.
+		"""
+		
+		if self.columnar is not None:
+			# Manual save: write the pending chunk only (the file stays open)
+			if final:
+				self.columnar.close()
+			else:
+				self.columnar.flush()
+			print(f"[SAVE] {self.columnar.n_rows} rows in column chunks -> {self.save_file}")
+			self._drop_wal(final)
+			return
+		
+		if self.segments is not None:
+			# Manual save: close the current segment only (the compressor keeps running)
+			if final:
+				self.segments.close()
+			else:
+				self.segments.roll()
+			print(f"[SAVE] {self.segments.n_rows} rows in {len(self.segments.segments)} segments -> {os.path.basename(self.segments.manifest)}")
+			self._drop_wal(final)
+			return
 		
 		if not self.data:
 			print("No data to save")
 			return
+		
+		if self.incremental and self.autosave_file:
+			self._finalize()
+			self._drop_wal(final)
+			if final:
+				self.data.close()		# removes the spill file (rows now in save_file)
+			return
 			
-		keys = self.data[0].keys()
+		keys = self.data.columns
 
 		with open(os.path.join(self.save_dir, self.save_file), "w", newline="") as f:
 			writer = csv.DictWriter(f, fieldnames=keys)
@@ -67,6 +209,9 @@ class DataLogger:
 			writer.writerows(self.data)
         
 		print(f"[SAVE] Data saved -> {self.save_file}")
+		self._drop_wal(final)
+		if final:
+			self.data.close()
 		
 		if self.autosave_file and os.path.exists(os.path.join(self.save_dir, self.autosave_file)):
 			try:
@@ -74,3 +219,36 @@ class DataLogger:
 				print(f"[CLEANUP] Autosave file removed -> {self.autosave_file}")
 			except Exception as e:
 				print(f"Coudl not remove autosave file: {e}")
+	
+	
+	def _drop_wal(self, final=True):
+		"""Final save done: the write-ahead log is no longer needed (manual save: commit it only)"""
+		
+		if self.wal is None:
+			return
+		
+		if not final:
+			self.wal.commit()
+			return
+		
+		self.wal.close()
+		try:
+			os.remove(self.wal.path)
+		except OSError as e:
+			print(f"Could not remove write-ahead log: {e}")
+		self.wal = None
+	
+	
+	def _finalize(self):
+		"""Incremental mode: appends remaining rows, closes the autosave file and renames it to save_file"""
+		
+		autosave_path = os.path.join(self.save_dir, self.autosave_file)
+		save_path = os.path.join(self.save_dir, self.save_file)
+		
+		n = self._append(autosave_path, self.fsync_policy != "never")
+		self._af.close()
+		self._af = None
+		self._writer = None
+		
+		os.replace(autosave_path, save_path)
+		print(f"[SAVE] {n} remaining rows appended, autosave finalized -> {self.save_file}")
@@ -3,42 +3,388 @@
 import u6
 import time
 import logging
+import logging.handlers
 import os
+import queue
+import struct
+import threading
+
+from collections import deque
+
+
+# --- Feedback packet limits (64 bytes USB packet) --- #
+FEEDBACK_MAX_CMD_BYTES = 64 - 7		# 7 bytes of Feedback command header
+FEEDBACK_MAX_RESP_BYTES = 64 - 9	# 9 bytes of Feedback response header
+
+
+class DeviceTrace:
+	"""
+	Sampled binary trace of device calls in a fixed-size ring buffer.
+	Each traced call writes one record (start time, call id, duration, status) in a
+	preallocated bytearray: no allocation nor I/O on the acquisition path.
+	- size: number of records kept (oldest overwritten)
+	- sample_every: trace 1 call out of sample_every
+	dump() writes the buffer to a file, read_trace() reads it back.
+	"""
+	
+	MAGIC = b"LJTRACE1"
+	RECORD = struct.Struct("<dHdB")		# perf_counter start, call id, duration [s], status (0 ok, 1 error)
+	
+	def __init__(self, size=4096, sample_every=1):
+		self.size = size
+		self.sample_every = sample_every
+		self.buf = bytearray(size * self.RECORD.size)
+		self.names = []
+		self.calls = 0
+		self.count = 0
+	
+	
+	def wrap(self, name, fn):
+		"""Returns fn wrapped so that its calls are traced under name"""
+		
+		if name not in self.names:
+			self.names.append(name)
+		cid = self.names.index(name)
+		rec = self.RECORD
+		
+		def traced(*args, **kwargs):
+			self.calls += 1
+			if self.calls % self.sample_every:
+				return fn(*args, **kwargs)
+			
+			status = 0
+			t0 = time.perf_counter()
+			try:
+				return fn(*args, **kwargs)
+			except Exception:
+				status = 1
+				raise
+			finally:
+				rec.pack_into(self.buf, (self.count % self.size) * rec.size, t0, cid, time.perf_counter() - t0, status)
+				self.count += 1
+		
+		return traced
+	
+	
+	def records(self):
+		"""Buffered records, oldest first: [(t, name, duration, status)]"""
+		
+		n = min(self.count, self.size)
+		first = self.count - n
+		rec = self.RECORD
+		out = []
+		for i in range(first, self.count):
+			t, cid, dt, status = rec.unpack_from(self.buf, (i % self.size) * rec.size)
+			out.append((t, self.names[cid], dt, status))
+		return out
+	
+	
+	def dump(self, path):
+		"""Writes the buffered records (oldest first) to a binary file"""
+		
+		n = min(self.count, self.size)
+		start = (self.count - n) % self.size * self.RECORD.size
+		end = n * self.RECORD.size
+		names = "\n".join(self.names).encode()
+		data = self.buf[start:] + self.buf[:start] if n == self.size else self.buf[:end]
+		
+		with open(path, "wb") as f:
+			f.write(self.MAGIC)
+			f.write(struct.pack("<II", len(names), n))
+			f.write(names)
+			f.write(data)
+		return n
+
+
+def read_trace(path):
+	"""Reads a DeviceTrace dump: [(t, name, duration, status)] oldest first"""
+	
+	rec = DeviceTrace.RECORD
+	with open(path, "rb") as f:
+		if f.read(len(DeviceTrace.MAGIC)) != DeviceTrace.MAGIC:
+			raise ValueError(f"{path} is not a device trace file")
+		len_names, n = struct.unpack("<II", f.read(8))
+		names = f.read(len_names).decode().split("\n")
+		data = f.read(n * rec.size)
+	
+	return [(t, names[cid], dt, status) for t, cid, dt, status in rec.iter_unpack(data)]
+
+
+def _median(values):
+	v = sorted(values)
+	n = len(v)
+	return v[n // 2] if n % 2 else 0.5 * (v[n // 2 - 1] + v[n // 2])
+
+
+def _trimmed_mean(values, trim=0.1):
+	"""Mean without the trim fraction of lowest and highest values"""
+	v = sorted(values)
+	k = int(len(v) * trim)
+	v = v[k:len(v) - k] or v
+	return sum(v) / len(v)
+
+
+def _robust_std(values):
+	"""Standard deviation estimate from the median absolute deviation"""
+	med = _median(values)
+	return 1.4826 * _median([abs(x - med) for x in values])
+
+
+def dac_command(channel, voltage):
+	"""16-bit DAC command (DAC0 or DAC1) for a 0-5V voltage"""
+	
+	voltage_bits = int((voltage/5.0) * 65535)
+	return u6.DAC0_16(voltage_bits) if channel == 0 else u6.DAC1_16(voltage_bits)
+
+
+class FeedbackTransaction:
+	"""
+	Collects several Feedback commands for one tick and sends them together.
+	- Reads: read_ain, read_dio, read_loadcell_raw, read_loadcell_force
+	- Writes: write_dio, write_dac
+	execute() packs the commands in as few getFeedback packets as possible
+	and returns a dict {name: value} for every read (None if it failed).
+	A transaction can be executed again (e.g. every tick) with the same commands,
+	or with commands swapped in place by patch().
+	"""
+	
+	def __init__(self, lj):
+		self.lj = lj
+		self.ops = []		# (name, command, decoder) ; decoder is None for writes
+		self._packets = None
+		self._results = None
+		self._slots = None		# op index -> (packet index, position)
+	
+	
+	def add(self, name, cmd, decoder=None):
+		"""Queue a prebuilt Feedback command (decoder(raw) -> value for reads)"""
+		
+		self.ops.append((name, cmd, decoder))
+		self._packets = None
+		return self
+	
+	
+	## -- Reads -- ##
+	
+	def read_ain(self, pin_name: str):
+		"""Queue a single-ended analog read (volts)"""
+		
+		if pin_name not in self.lj.adc_pins:
+			self.lj.logger.warning(f"{pin_name} is not a valid AIN channel.")
+			return self.add(pin_name, None, None)
+		
+		cmd = u6.AIN24(self.lj.adc_pins[pin_name])
+		return self.add(pin_name, cmd, lambda raw: self.lj.d.binaryToCalibratedAnalogVoltage(0, raw))
+	
+	
+	def read_dio(self, pin_name: str):
+		"""Queue a digital state read"""
+		
+		if pin_name not in self.lj.dio_pins:
+			self.lj.logger.warning(f"{pin_name} is not a valid DIO pin.")
+			return self.add(pin_name, None, None)
+		
+		cmd = u6.BitStateRead(self.lj.dio_pins[pin_name])
+		return self.add(pin_name, cmd, bool)
+	
+	
+	def read_loadcell_raw(self, name):
+		"""Queue a differential loadcell read (volts)"""
+		return self._queue_loadcell(name, force=False)
+	
+	
+	def read_loadcell_force(self, name):
+		"""Queue a loadcell read, converted in the loadcell's own unit"""
+		return self._queue_loadcell(name, force=True)
+	
+	
+	def _queue_loadcell(self, name, force):
+		
+		if name not in self.lj.loadcells:
+			self.lj.logger.warning(f"Loadcell {name} not found for reading.")
+			return self.add(name, None, None)
+		
+		lc = self.lj.loadcells[name]
+		cmd = u6.AIN24(lc["AIN_pos"], GainIndex = lc["Gain_idx"], Differential = True)
+		
+		def decode(raw):
+			voltage = self.lj.d.binaryToCalibratedAnalogVoltage(lc["Gain_idx"], raw)
+			return self.lj.loadcell_force(name, voltage) if force else voltage
+		
+		return self.add(name, cmd, decode)
+	
+	
+	## -- Writes -- ##
+	
+	def write_dio(self, pin_name: str, state: int):
+		"""Queue a digital state write"""
+		
+		if pin_name not in self.lj.dio_pins:
+			self.lj.logger.warning(f"{pin_name} is not a valid DIO pin.")
+			return self
+		
+		return self.add(pin_name, u6.BitStateWrite(self.lj.dio_pins[pin_name], state), None)
+	
+	
+	def write_dac(self, pin_name: str, voltage: float):
+		"""Queue a DAC write (0-5V)"""
+		
+		if pin_name not in self.lj.dac_pins:
+			self.lj.logger.warning(f"{pin_name} is not a DAC output.")
+			return self
+		
+		if not (0.0 <= voltage <= 5.0):
+			self.lj.logger.warning(f"Voltage {voltage}V out of range [0,5].")
+			return self
+		
+		return self.add(pin_name, dac_command(self.lj.dac_pins[pin_name], voltage), None)
+	
+	
+	def patch(self, i, cmd):
+		"""Replaces the command of op i by one of the same size (cached packets kept)"""
+		
+		name, _, decoder = self.ops[i]
+		op = self.ops[i] = (name, cmd, decoder)
+		if self._packets is not None:
+			p, j = self._slots[i]
+			self._packets[p][j] = op
+	
+	
+	## -- Execution -- ##
+	
+	def packets(self):
+		"""Split queued commands in packets fitting the Feedback size limits (cached)."""
+		
+		if self._packets is not None:
+			return self._packets
+		
+		packets = []
+		current = []
+		cmd_bytes = 0
+		resp_bytes = 0
+		slots = {}
+		
+		for i, op in enumerate(self.ops):
+			cmd = op[1]
+			if cmd is None:
+				continue
+			
+			size = len(cmd.cmdBytes)
+			read = cmd.readLen
+			
+			if current and (cmd_bytes + size > FEEDBACK_MAX_CMD_BYTES or resp_bytes + read > FEEDBACK_MAX_RESP_BYTES):
+				packets.append(current)
+				current = []
+				cmd_bytes = 0
+				resp_bytes = 0
+			
+			slots[i] = (len(packets), len(current))
+			current.append(op)
+			cmd_bytes += size
+			resp_bytes += read
+		
+		if current:
+			packets.append(current)
+		
+		self._packets = packets
+		self._slots = slots
+		self._results = {name: None for name, cmd, decoder in self.ops if decoder is not None or cmd is None}
+		return packets
+	
+	
+	def execute(self):
+		"""Send the queued commands and return decoded reads {name: value}."""
+		
+		packets = self.packets()
+		results = self._results.copy()
+		
+		for packet in packets:
+			try:
+				raw = self.lj.d.getFeedback([op[1] for op in packet])
+			except Exception as e:
+				self.lj.logger.error(f"Feedback transaction failed ({len(packet)} commands): {e}")
+				self.lj.dump_trace()
+				continue
+			
+			# getFeedback may only return results for commands with a response
+			if len(raw) != len(packet):
+				it = iter(raw)
+				raw = [next(it, None) if op[1].readLen > 0 else None for op in packet]
+			
+			for (name, cmd, decoder), val in zip(packet, raw):
+				if decoder is None:
+					continue
+				try:
+					results[name] = decoder(val)
+				except Exception as e:
+					self.lj.logger.error(f"Failed to decode {name}: {e}")
+		
+		self.lj.logger.debug("Transaction done: %d commands -> %s", len(self.ops), results)
+		return results
 
 
 class LabJackU6Controller:
 	
-	def __init__(self, log_dir="logs/", log_file="LabJackU6.log"):
+	def __init__(self, log_dir="logs/", log_file="LabJackU6.log", device=None, serial=None, debug=False, trace_size=0, trace_every=1):
+		"""
+		- device: optional already opened device backend (e.g. sim.SimulatedU6).
+		  Default opens the U6 with the given serial number, or the first U6 found.
+		- debug: enables debug records (otherwise debug calls cost a level check only)
+		- trace_size: if > 0, device calls are traced in a DeviceTrace ring buffer of
+		  trace_size records (1 call out of trace_every), dumped by dump_trace()
+		Log records are handed to a QueueListener thread: file/console I/O stays
+		out of the acquisition tick.
+		"""
 		
 		# --- Initialisation logger --- #
 		os.makedirs(log_dir, exist_ok=True)
 		path = os.path.join(log_dir, log_file)
+		self.log_dir = log_dir
+		self.log_file = log_file
 
 		self.logger = logging.getLogger(f"LabJackU6-{id(self)}")
-		self.logger.setLevel(logging.DEBUG)
+		self.logger.setLevel(logging.DEBUG if debug else logging.INFO)
+		self._log_listener = None
+		self._log_qh = None
 
-		fh = logging.FileHandler(path)
-		ch = logging.StreamHandler()
-		fh.setLevel(logging.DEBUG)
-		ch.setLevel(logging.INFO)
+		if not self.logger.handlers:
+			fh = logging.FileHandler(path)
+			ch = logging.StreamHandler()
+			fh.setLevel(logging.DEBUG)
+			ch.setLevel(logging.INFO)
 
-		formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-		fh.setFormatter(formatter)
-		ch.setFormatter(formatter)
+			formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+			fh.setFormatter(formatter)
+			ch.setFormatter(formatter)
 
-		if not self.logger.handlers:
-			self.logger.addHandler(fh)
-			self.logger.addHandler(ch)
+			log_q = queue.SimpleQueue()
+			self._log_qh = logging.handlers.QueueHandler(log_q)
+			self.logger.addHandler(self._log_qh)
+			self._log_listener = logging.handlers.QueueListener(log_q, fh, ch, respect_handler_level=True)
+			self._log_listener.start()
 
 		self.logger.info("LabJackU6Controller initialized")
 
 		# --- LabjackU6 connection --- #
 		try:
-			self.d = u6.U6()
-			self.logger.info("LabJackU6 connected")
+			if device is not None:
+				self.d = device
+			elif serial is not None:
+				self.d = u6.U6(firstFound = False, serial = serial)
+			else:
+				self.d = u6.U6()
+			self.logger.info(f"LabJackU6 connected ({type(self.d).__name__})")
 		except Exception as e:
 			self.logger.error(f"LabJackU6 connection not possible: {e}")
 			raise
+		
+		# --- Device calls trace (optional) --- #
+		self.trace = None
+		self._last_dump = None
+		if trace_size > 0:
+			self.trace = DeviceTrace(trace_size, trace_every)
+			self.d.getFeedback = self.trace.wrap("getFeedback", self.d.getFeedback)
+			self.d.getAIN = self.trace.wrap("getAIN", self.d.getAIN)
             
 		# --- PINS dictionnaries --- #
 		self.dio_pins = {f"FIO{i}": i for i in range(8)}
@@ -48,6 +394,16 @@ class LabJackU6Controller:
 		
 		# --- LoadCell(s) configuration --- #
 		self.loadcells = {}
+		
+		# --- Stream configuration --- #
+		self.stream_channels = []		# list of (name, stream key, is_loadcell)
+		self.stream_frequency = None
+		self.stream_buffer = None
+		self.stream_stale_blocks = 4
+		self.stream_errors = 0
+		self.stream_missed = 0
+		self.streaming = False
+		self._stream_th = None
 
 
 	## -- DIGITAL Functions -- ##
@@ -84,7 +440,7 @@ class LabJackU6Controller:
 		
 		try:
 			self.d.getFeedback(u6.BitStateWrite(self.dio_pins[pin_name], state))
-			self.logger.debug(f"{pin_name} state changed to {state}")
+			self.logger.debug("%s state changed to %s", pin_name, state)
 		except Exception as e:
 			self.logger.error(f"Failed to write {pin_name}: {e}")
 
@@ -99,7 +455,7 @@ class LabJackU6Controller:
 		try:
 			r = self.d.getFeedback(u6.BitStateRead(self.dio_pins[pin_name]))
 			state = bool(r[0])
-			self.logger.debug(f"{pin_name} reads {state}")
+			self.logger.debug("%s reads %s", pin_name, state)
 			return state
 		except Exception as e:
 			self.logger.error(f"Failed to read {pin_name}: {e}")
@@ -126,7 +482,7 @@ class LabJackU6Controller:
 				self.d.getFeedback(u6.DAC0_16(voltage_bits))
 			else:
 				self.d.getFeedback(u6.DAC1_16(voltage_bits))
-			self.logger.debug(f"{pin_name} set to {voltage:.3f}V ({voltage_bits} bits).")
+			self.logger.debug("%s set to %.3fV (%d bits).", pin_name, voltage, voltage_bits)
 		except Exception as e:
 			self.logger.error(f"Failed to write {pin_name}: {e}")
 
@@ -140,7 +496,7 @@ class LabJackU6Controller:
 		
 		try:
 			voltage = self.d.getAIN(self.adc_pins[pin_name])
-			self.logger.debug(f"{pin_name} reads {voltage:.5f}V.")
+			self.logger.debug("%s reads %.5fV.", pin_name, voltage)
 			return voltage
 		except Exception as e:
 			self.logger.error(f"Failed to read {pin_name}: {e}")
@@ -171,6 +527,7 @@ class LabJackU6Controller:
 			"Rated_Force": rated_F,
 			"mV_per_V": mVperV,
 			"Offset": 0.0,
+			"Noise": None,
 			"Gain_idx": gain_idx
 			}
 		
@@ -179,32 +536,76 @@ class LabJackU6Controller:
 	
 	def tare_loadcell(self, name, samples=50, delay=0.005):
 		"""Perform tare (offset calc.) for a given loadcell"""
+		return self.tare_loadcells([name], samples, delay).get(name, False)
+	
+	
+	def tare_loadcells(self, names=None, samples=50, delay=0.002, trim=0.1, max_noise=None, timeout=5.0):
+		"""
+		Tare several loadcells at once (default: every registered loadcell).
+		- All loadcells are read in one Feedback transaction per sample
+		- Offset: trimmed mean (trim fraction cut at each end), robust to spikes
+		- Noise: robust standard deviation (1.4826 * MAD), stored next to the offset
+		- Stability: if max_noise (V) is given, a loadcell whose noise or drift
+		  (median of 2nd half - median of 1st half) exceeds it keeps its previous offset
+		- Stops after samples readings or timeout seconds
+		Returns {name: True if tared}.
+		"""
 		
-		if name not in self.loadcells:
-			self.logger.warning(f"Loadcell {name} not found for tare.")
-			return
+		names = list(self.loadcells) if names is None else names
+		for name in names:
+			if name not in self.loadcells:
+				self.logger.warning(f"Loadcell {name} not found for tare.")
+		names = [n for n in names if n in self.loadcells]
+		if not names:
+			return {}
+		
+		tx = self.transaction()
+		for name in names:
+			tx.read_loadcell_raw(name)
 		
-		acc = 0.0
-		count = 0
+		values = {name: [] for name in names}
+		t_end = time.monotonic() + timeout
 		
 		for s in range(samples):
-			val = self.read_loadcell_raw(name)
-			if val is not None:
-				acc += val
-				count += 1
+			for name, val in tx.execute().items():
+				if val is not None:
+					values[name].append(val)
+			if time.monotonic() > t_end:
+				self.logger.warning(f"Tare timeout after {s + 1}/{samples} samples.")
+				break
 			time.sleep(delay)
 		
-		if count ==0:
-			self.logger.error(f"Tare failed: no valid readings for {name}.")
-			return
-		
-		offset = acc / count
-		self.loadcells[name]["Offset"] = offset
+		result = {}
+		for name in names:
+			vals = values[name]
+			if not vals:
+				self.logger.error(f"Tare failed: no valid readings for {name}.")
+				result[name] = False
+				continue
+			
+			offset = _trimmed_mean(vals, trim)
+			noise = _robust_std(vals)
+			half = len(vals) // 2
+			drift = abs(_median(vals[half:]) - _median(vals[:half])) if half else 0.0
+			
+			if max_noise is not None and (noise > max_noise or drift > max_noise):
+				self.logger.error(
+					f"Tare rejected for '{name}': unstable signal "
+					f"(noise {noise:.6f} V, drift {drift:.6f} V > {max_noise:.6f} V)."
+					)
+				result[name] = False
+				continue
+			
+			self.loadcells[name]["Offset"] = offset
+			self.loadcells[name]["Noise"] = noise
+			result[name] = True
+			
+			self.logger.info(
+				f"Loadcell '{name}' tared with offset {offset:.6f} V "
+				f"(trimmed mean over {len(vals)} samples, noise {noise:.6f} V, drift {drift:.6f} V)."
+				)
 		
-		self.logger.info(
-			f"Loadcell '{name}' tared with offset {offset:.6f} V"
-			f"(avg over {count} samples)."
-			)
+		return result
 	
 	
 	def read_loadcell_raw(self, name):
@@ -218,7 +619,7 @@ class LabJackU6Controller:
 		
 		try:
 			voltage = self.d.getAIN(lc["AIN_pos"], gainIndex = lc["Gain_idx"], differential = True)
-			self.logger.debug(f"Loadcell '{name}' raw reading: {voltage:.6f}V.")
+			self.logger.debug("Loadcell '%s' raw reading: %.6fV.", name, voltage)
 			return voltage
 		except Exception as e:
 			self.logger.error(f"Failed to read loadcell '{name}': {e}")
@@ -232,23 +633,254 @@ class LabJackU6Controller:
 			self.logger.warning(f"Loadcell {name} not found for reading.")
 			return
 		
-		lc = self.loadcells[name]
-		
 		try:
 			raw = self.read_loadcell_raw(name)
 			
 			if raw is None:
 				return None
 			
-			voltage = raw - lc["Offset"]
-			force = (voltage / (lc["Excitation"] * lc["mV_per_V"])) * lc["Rated_Force"]
-			self.logger.debug(f"Loadcell '{name}' force: {force:.3f} units.")
+			force = self.loadcell_force(name, raw)
+			self.logger.debug("Loadcell '%s' force: %.3f units.", name, force)
 			return force
 		except Exception as e:
 			self.logger.error(f"Failed to read loadcell '{name}' force: {e}")
 			return None
 	
 	
+	def loadcell_force(self, name, raw):
+		"""Converts a raw differential voltage of a loadcell to force (own unit)"""
+		
+		lc = self.loadcells[name]
+		voltage = raw - lc["Offset"]
+		return (voltage / (lc["Excitation"] * lc["mV_per_V"])) * lc["Rated_Force"]
+	
+	
+	## -- Batched Feedback -- ##
+	
+	def transaction(self):
+		"""Returns an empty FeedbackTransaction bound to this device"""
+		return FeedbackTransaction(self)
+	
+	
+	
+	## -- Stream functions -- ##
+	
+	def configure_stream(self, channels, scan_frequency=1000, resolution_index=0, settling_factor=0, samples_per_packet=25, buffer_blocks=200, stale_blocks=4):
+		"""
+		Configure hardware-timed stream acquisition.
+		- channels: list of AIN names (single-ended) and/or loadcell names (differential pair)
+		- scan_frequency: scans per second (each scan reads every channel once)
+		- buffer_blocks: number of converted blocks kept in the ring buffer
+		- stale_blocks: the latest block is stale once older than that many block periods
+		  (stream_sample then returns None)
+		"""
+		
+		if self.streaming:
+			self.logger.warning("Stream already running. Configuration not changed.")
+			return False
+		
+		numbers = []
+		options = []
+		stream_channels = []
+		
+		for name in channels:
+			if name in self.loadcells:
+				lc = self.loadcells[name]
+				ch = lc["AIN_pos"]
+				opt = 0x80 | ((lc["Gain_idx"] & 0x03) << 4)		# bit 7: differential, bits 4-5: gain index
+				is_lc = True
+			elif name in self.adc_pins:
+				ch = self.adc_pins[name]
+				opt = 0
+				is_lc = False
+			else:
+				self.logger.warning(f"{name} is neither an AIN channel nor a loadcell. Stream not configured.")
+				return False
+			
+			if ch in numbers:
+				self.logger.warning(f"AIN{ch} is used twice in the scan list ({name}). Stream not configured.")
+				return False
+			
+			numbers.append(ch)
+			options.append(opt)
+			stream_channels.append((name, f"AIN{ch}", is_lc))
+		
+		if not numbers:
+			self.logger.warning("Empty scan list. Stream not configured.")
+			return False
+		
+		try:
+			self.d.streamConfig(
+				NumChannels = len(numbers),
+				ResolutionIndex = resolution_index,
+				SettlingFactor = settling_factor,
+				SamplesPerPacket = samples_per_packet,
+				ChannelNumbers = numbers,
+				ChannelOptions = options,
+				ScanFrequency = scan_frequency
+				)
+		except Exception as e:
+			self.logger.error(f"Failed to configure stream: {e}")
+			return False
+		
+		self.stream_channels = stream_channels
+		self.stream_frequency = scan_frequency
+		self.stream_buffer = deque(maxlen=buffer_blocks)
+		self.stream_stale_blocks = stale_blocks
+		
+		self.logger.info(f"Stream configured: {[c[0] for c in stream_channels]} at {scan_frequency} Hz.")
+		return True
+	
+	
+	def start_stream(self):
+		"""Start the stream and its background reader thread"""
+		
+		if not self.stream_channels:
+			self.logger.warning("Stream not configured. Call configure_stream() first.")
+			return False
+		
+		if self.streaming:
+			return True
+		
+		try:
+			self.d.streamStart()
+		except Exception as e:
+			self.logger.error(f"Failed to start stream: {e}")
+			return False
+		
+		self.stream_errors = 0
+		self.stream_missed = 0
+		self.streaming = True
+		self._stream_th = threading.Thread(target=self._stream_reader, daemon=True)
+		self._stream_th.start()
+		
+		self.logger.info("Stream started.")
+		return True
+	
+	
+	def stop_stream(self):
+		"""Stop the background reader and the device stream"""
+		
+		if not self.streaming:
+			return
+		
+		self.streaming = False
+		if self._stream_th is not None:
+			self._stream_th.join(timeout=2.0)
+			self._stream_th = None
+		
+		try:
+			self.d.streamStop()
+			self.logger.info(f"Stream stopped ({self.stream_missed} missed samples, {self.stream_errors} errors).")
+		except Exception as e:
+			self.logger.error(f"Failed to stop stream: {e}")
+	
+	
+	def _stream_reader(self):
+		"""Background thread: converts stream packets into blocks and pushes them in the ring buffer"""
+		
+		scan_index = 0
+		
+		try:
+			for r in self.d.streamData():
+				if not self.streaming:
+					break
+				
+				if r is None:
+					continue
+				
+				self.stream_errors += r["errors"]
+				self.stream_missed += r["missed"]
+				scan_index += r["missed"] // len(self.stream_channels)
+				
+				block = {}
+				for name, key, is_lc in self.stream_channels:
+					values = r[key]
+					block[name] = [self.loadcell_force(name, v) for v in values] if is_lc else values
+				
+				n = len(block[self.stream_channels[0][0]])
+				block["t0"] = scan_index / self.stream_frequency
+				block["n"] = n
+				block["received"] = time.time()
+				scan_index += n
+				
+				self.stream_buffer.append(block)
+		
+		except Exception as e:
+			self.logger.error(f"Stream reader stopped: {e}")
+			self.streaming = False
+			
+			# Leaves stream mode so that Feedback reads work again
+			try:
+				self.d.streamStop()
+			except Exception as e:
+				self.logger.error(f"Failed to stop stream: {e}")
+	
+	
+	def stream_block(self):
+		"""Returns the latest converted block {name: [values], "t0": s, "n": count} or None"""
+		
+		if not self.stream_buffer:
+			return None
+		return self.stream_buffer[-1]
+	
+	
+	def stream_sample(self, name):
+		"""
+		Returns the latest streamed sample of a channel or loadcell, or None
+		if the stream is not running or its latest block is stale (see configure_stream)
+		"""
+		
+		if not self.streaming:
+			return None
+		
+		block = self.stream_block()
+		if block is None or name not in block or not block[name]:
+			return None
+		if time.time() - block["received"] > self.stream_stale_blocks * block["n"] / self.stream_frequency:
+			return None
+		return block[name][-1]
+	
+	
+	def stream_drain(self):
+		"""
+		Returns every buffered block (oldest first) and empties the ring buffer.
+		The acquisition loop only uses the latest sample per tick (stream_sample):
+		the full rate blocks are not logged unless a caller drains them.
+		"""
+		
+		blocks = []
+		while self.stream_buffer:
+			blocks.append(self.stream_buffer.popleft())
+		return blocks
+	
+	
+	## -- Diagnostics -- ##
+	
+	def dump_trace(self, min_interval=5.0):
+		"""
+		Writes the device calls trace to <log_dir>/<log_file stem>_trace.bin (if tracing is on).
+		At most one dump every min_interval seconds (repeated errors don't flood the disk).
+		Returns the dump path or None.
+		"""
+		
+		if self.trace is None:
+			return None
+		
+		now = time.monotonic()
+		if self._last_dump is not None and now - self._last_dump < min_interval:
+			return None
+		self._last_dump = now
+		
+		path = os.path.join(self.log_dir, os.path.splitext(self.log_file)[0] + "_trace.bin")
+		try:
+			n = self.trace.dump(path)
+			self.logger.info(f"Device trace dumped ({n} records) -> {path}")
+			return path
+		except Exception as e:
+			self.logger.error(f"Failed to dump device trace: {e}")
+			return None
+	
 	
 	## -- Proper closing -- ##
 	
@@ -261,6 +893,8 @@ class LabJackU6Controller:
 		
 		self.logger.info("Initiation of the closing sequence.")
 		
+		self.stop_stream()
+		
 		try:
 			
 			# Handle DIOs shutdown value
@@ -315,3 +949,16 @@ class LabJackU6Controller:
 			
 		except Exception as e:
 			self.logger.error(f"Error while closing LabJacku6 : {e}")
+			self.dump_trace(min_interval=0)
+		
+		finally:
+			# Flush pending records, close the log file, then log synchronously to the console
+			if self._log_listener is not None:
+				self._log_listener.stop()
+				self.logger.removeHandler(self._log_qh)
+				for h in self._log_listener.handlers:
+					if isinstance(h, logging.FileHandler):
+						h.close()
+					else:
+						self.logger.addHandler(h)
+				self._log_listener = None
@@ -3,5 +3,7 @@
 from .base import BaseController
 from .dio_basic import DioBasicController
 from .brake_bench import BrakeBenchController
+from .features import CycleFeatureExtractor, CycleTable
+from .group import ControllerGroup
 
-__all__ = ["BaseController", "DioBasicController", "BrakeBenchController"]
+__all__ = ["BaseController", "DioBasicController", "BrakeBenchController", "CycleFeatureExtractor", "CycleTable", "ControllerGroup"]
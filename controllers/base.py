@@ -1,8 +1,164 @@
 # controllers/base.py
 
 from typing import Dict, Any
+from bisect import insort
+import math
 import time
 
+
+### -- Streaming statistics (constant time & memory per sample) -- ###
+
+class P2Quantile:
+	"""Online quantile estimate with the P² algorithm (5 markers, no history kept)."""
+	
+	def __init__(self, p: float):
+		self.p = p
+		self.n = 0
+		self.q = []
+		self.pos = [1, 2, 3, 4, 5]
+		self.des = [1, 1 + 2*p, 1 + 4*p, 3 + 2*p, 5]
+		self.inc = [0, p/2, p, (1 + p)/2, 1]
+	
+	def update(self, x: float):
+		q, pos = self.q, self.pos
+		self.n += 1
+		
+		# Initialisation with the 5 first samples
+		if self.n <= 5:
+			insort(q, x)
+			return
+		
+		# Cell k containing x
+		if x < q[0]:
+			q[0] = x
+			k = 0
+		elif x >= q[4]:
+			q[4] = x
+			k = 3
+		else:
+			k = 0
+			while x >= q[k+1]:
+				k += 1
+		
+		for i in range(k+1, 5):
+			pos[i] += 1
+		for i in range(5):
+			self.des[i] += self.inc[i]
+		
+		# Marker adjustment
+		for i in (1, 2, 3):
+			d = self.des[i] - pos[i]
+			if (d >= 1 and pos[i+1] - pos[i] > 1) or (d <= -1 and pos[i-1] - pos[i] < -1):
+				d = 1 if d > 0 else -1
+				qp = q[i] + d / (pos[i+1] - pos[i-1]) * (
+					(pos[i] - pos[i-1] + d) * (q[i+1] - q[i]) / (pos[i+1] - pos[i])
+					+ (pos[i+1] - pos[i] - d) * (q[i] - q[i-1]) / (pos[i] - pos[i-1])
+					)
+				if not q[i-1] < qp < q[i+1]:
+					qp = q[i] + d * (q[i+d] - q[i]) / (pos[i+d] - pos[i])
+				q[i] = qp
+				pos[i] += d
+	
+	def value(self):
+		if self.n == 0:
+			return None
+		if self.n <= 5:
+			return self.q[min(len(self.q) - 1, int(round(self.p * (len(self.q) - 1))))]
+		return self.q[2]
+
+
+class StreamStats:
+	"""
+	Streaming statistics of a scalar series (cycle time, push duration, peak force...):
+	- count, mean, variance (Welford), min, max
+	- EWMA of the value (alpha) -> recent level, e.g. 1/EWMA(cycle time) = rate
+	- approximate percentiles (P²)
+	"""
+	
+	def __init__(self, percentiles=(0.5, 0.99), alpha=0.1):
+		self.alpha = alpha
+		self.n = 0
+		self.mean = 0.0
+		self._m2 = 0.0
+		self.min = None
+		self.max = None
+		self.ewma = None
+		self.last = None
+		self.quantiles = {p: P2Quantile(p) for p in percentiles}
+	
+	def update(self, x: float):
+		self.n += 1
+		self.last = x
+		
+		delta = x - self.mean
+		self.mean += delta / self.n
+		self._m2 += delta * (x - self.mean)
+		
+		self.min = x if self.min is None else min(self.min, x)
+		self.max = x if self.max is None else max(self.max, x)
+		self.ewma = x if self.ewma is None else self.ewma + self.alpha * (x - self.ewma)
+		
+		for est in self.quantiles.values():
+			est.update(x)
+	
+	@property
+	def std(self):
+		return math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else 0.0
+	
+	def quantile(self, p):
+		return self.quantiles[p].value() if p in self.quantiles else None
+	
+	def eta(self, remaining, z=1.96):
+		"""
+		Time for `remaining` more events of this duration series: (center, low, high).
+		Center from the EWMA (follows drifts), band from the variance of a sum of independent durations.
+		"""
+		
+		if self.ewma is None or remaining <= 0:
+			return (None, None, None) if remaining > 0 else (0.0, 0.0, 0.0)
+		
+		center = remaining * self.ewma
+		half = z * self.std * math.sqrt(remaining)
+		return center, max(0.0, center - half), center + half
+	
+	def describe(self, fmt="{:.2f}", unit="s"):
+		"""Short text "p50 x / p99 y" for displays"""
+		
+		if self.n == 0:
+			return "--"
+		return " / ".join(f"p{p*100:g} {fmt.format(self.quantile(p))}{unit}" for p in self.quantiles)
+	
+	def snapshot(self):
+		return {
+			"n": self.n,
+			"mean": self.mean,
+			"std": self.std,
+			"min": self.min,
+			"max": self.max,
+			"ewma": self.ewma,
+			**{f"p{p*100:g}": self.quantile(p) for p in self.quantiles}
+			}
+
+
+class TickClock:
+	"""
+	Clock frozen during a tick: tick() reads the source clock once, then every call returns
+	that same time. Installed by the acquisition loop, so all the controller timestamps of one
+	compute() equal the logged TimeABS and a replay (sim/replay.py) sees exactly the same times.
+	"""
+	
+	def __init__(self, source=time.time):
+		self.source = source
+		self.t = source()
+	
+	def __call__(self):
+		return self.t
+	
+	def tick(self):
+		self.t = self.source()
+		return self.t
+
+
 class BaseController:
 	"""
 	Base cxontroller class providing a standard interface for all bench controllers.
@@ -12,21 +168,122 @@ class BaseController:
 	- self.states: persistent outputs ({pin: value})
 	- self.phase: current state-machine phase
 	- self.handler: dict mapping phase name -> handler function(inputs)
+	- self.report_fields: extra (non-pin) keys returned by compute, logged as columns
+	- self.report_kinds: optional {report field: "float" | "int" | "bool" | "str"} (default float)
+	- self.hmi_fields: HMI rows [(label, attribute, format) or None for a separator]
+	
+	Optional scheduling hints read by the acquisition loop after each tick:
+	- self.sample_periods: {phase: period [s]} (phases not listed use the loop interval)
+	- self.phase_timeouts: {phase: duration [s]} -> wake exactly when the phase times out
+	
+	Cycle and push statistics (CPM, ETA with confidence band, p50/p99) are shared here.
+	
+	Every timestamp comes from self.clock (default time.time, see set_clock): the acquisition
+	loop installs a TickClock, a replay engine (sim/replay.py) a virtual clock to run the
+	state machine faster than real time.
 	"""
 	
-	def __init__(self):
+	def __init__(self, clock=time.time):
+		self.clock = clock
 		self.required_inputs = []
 		self.states = {}
 		self.phase = "idle"
 		self.phase_start = None
 		self.handler = {}
+		self.report_fields = []
+		self.report_kinds = {}
+		self.hmi_fields = [("Phase", "phase", "{}")]
+		
+		# Acquisition scheduling hints (see sample_period / wake_deadline)
+		self.sample_periods = {}
+		self.phase_timeouts = {}
+		
+		# Cycle statistics (CPM and ETA)
+		self.cycle_counter = 0
+		self.max_cycles = None
+		self.cycle_time = StreamStats(alpha=0.01)		# ~ sliding window of 200 cycles
+		self.last_cycle_t = None
+		self.cycle_speed = 0.0
+		self.eta_s = None
+		self.eta_band = None
+		
+		# Push timing statistics
+		self.push_start = None
+		self.push_time = StreamStats(alpha=0.01)
+		self.last_push_duration = None
+		self.avg_push_duration = None
+		
+		# Per-cycle feature extraction (optional, see controllers/features.py)
+		self.features = None
 	
 	def transition(self, new_phase: str):
 		"""Switch to a new phase and reset its start timestamp."""
+		old_phase = self.phase
 		self.phase = new_phase
-		self.phase_start = time.time()
+		self.phase_start = self.clock()
+		
+		if self.features is not None:
+			self.features.on_transition(old_phase, new_phase, self.phase_start)
 		return new_phase
 	
+	def set_clock(self, clock):
+		"""Replaces the clock (callable returning time.time-like seconds)"""
+		self.clock = clock
+	
+	def sample_period(self):
+		"""Desired sample period in the current phase (None: acquisition loop interval)"""
+		return self.sample_periods.get(self.phase)
+	
+	def wake_deadline(self):
+		"""Absolute time (self.clock) at which the next tick is needed at the latest, or None"""
+		timeout = self.phase_timeouts.get(self.phase)
+		if timeout is None or self.phase_start is None:
+			return None
+		return self.phase_start + timeout
+	
+	def attach_features(self, extractor):
+		"""Attach a CycleFeatureExtractor fed by phase transitions and observe()"""
+		extractor.attach(self)
+		self.features = extractor
+		return extractor
+	
+	def observe(self, value):
+		"""Feeds the tracked signal (e.g. force) to the feature extractor, if any"""
+		if self.features is not None:
+			self.features.observe(value, self.clock())
+	
+	
+	### -- Fonction for statistics -- ###
+	def _on_cycle_completed(self):
+		"""Function called when a cycle finishes: updates CPM and ETA."""
+		
+		now = self.clock()
+		if self.last_cycle_t is not None:
+			self.cycle_time.update(now - self.last_cycle_t)
+		self.last_cycle_t = now
+		
+		# CPM from the EWMA of the cycle time
+		ewma = self.cycle_time.ewma
+		self.cycle_speed = 60.0 / ewma if ewma else 0.0
+		
+		# ETA with confidence band
+		if self.max_cycles is None:
+			return
+		remaining = self.max_cycles - self.cycle_counter
+		self.eta_s, lo, hi = self.cycle_time.eta(remaining)
+		self.eta_band = None if self.eta_s is None else (lo, hi)
+	
+	def _on_push_completed(self):
+		"""Compute timing stats when a pushing phase completes."""
+		
+		if self.push_start is None:
+			return
+		
+		duration = self.clock() - self.push_start
+		self.last_push_duration = duration
+		self.push_time.update(duration)
+		self.avg_push_duration = self.push_time.ewma
+	
 	
 	def compute(self, inputs: Dict[str, float]) -> Dict[str, Any]:
 		"""
@@ -1,13 +1,14 @@
 # controllers/brake_bench.py
 
-from .base import BaseController
+from .base import BaseController, StreamStats
 from typing import Dict, Any
-from collections import deque
 import time
 
 class BrakeBenchController(BaseController):
 	
-	def __init__(self, target_up=-111.0, target_down=-1.0, max_cycles=10000, rest_time=1.0):
+	def __init__(self, target_up=-111.0, target_down=-1.0, max_cycles=10000, rest_time=1.0, idle_period=0.25, clock=time.time):
+		
+		super().__init__(clock)
 		
 		# Variable storage
 		self.phase = "idle"
@@ -19,16 +20,9 @@ class BrakeBenchController(BaseController):
 		self.phase_start = None
 		self.last_force = None
 		
-		# Variable for ETA and CPM
-		self.cycle_timestamps = deque(maxlen=200)
-		self.cycle_speed = 0.0
-		self.eta_s = None
-		
-		# Variable for Push timing tracking
-		self.push_start = None
-		self.push_times = deque(maxlen=200)
-		self.last_push_duration = None
-		self.avg_push_duration = None
+		# Peak force of each push (most negative force while pushing)
+		self.push_peak = None
+		self.peak_force = StreamStats()
 		
 		# Initialise outputs states at 1 (rest - inverted because of relay board)
 		self.states = {
@@ -39,6 +33,37 @@ class BrakeBenchController(BaseController):
 		# Required inputs
 		self.required_inputs = ["LC0"]
 		
+		# Extra outputs reported by compute (logged columns)
+		self.report_fields = ["phase", "cycle_count", "cycle_cpm", "eta_s", "push_avg"]
+		self.report_kinds = {"phase": "str", "cycle_count": "int"}
+		
+		# HMI rows: (label, attribute, format) or None for a separator
+		self.hmi_fields = [
+			("Cycle", "cycle_counter", "{}"),
+			("Phase", "phase", "{}"),
+			("Force (LC0)", "last_force", "{:.2f}N"),
+			("Cycle speed", "cycle_speed", "{:.2f} cpm"),
+			("Push AVG", "avg_push_duration", "{:.2f}s"),
+			("Push time", "push_time", lambda st: st.describe()),
+			("Cycle time", "cycle_time", lambda st: st.describe()),
+			("Peak force", "peak_force", lambda st: st.describe("{:.1f}", "N")),
+			None,
+			("ETA", "eta_s", lambda s: f"{s/60:.1f}min"),
+			("ETA band", "eta_band", lambda b: f"{b[0]/60:.1f} - {b[1]/60:.1f}min")
+			]
+		
+		# Sampling: loop interval while moving, idle_period while resting,
+		# with a wake-up exactly at the end of each rest
+		self.sample_periods = {
+			"wait_after_push": idle_period,
+			"wait_after_pull": idle_period,
+			"end_of_test": idle_period
+			}
+		self.phase_timeouts = {
+			"wait_after_push": rest_time,
+			"wait_after_pull": rest_time
+			}
+		
 		# State handler for more clarity
 		self.handler = {
 			"idle": self._state_idle,
@@ -50,45 +75,6 @@ class BrakeBenchController(BaseController):
 			}
 	
 	
-	### -- Fonction for statistics -- ###
-	def _on_cycle_completed(self):
-		"""Fucntion called when a cycle finishes."""
-		
-		now = time.time()
-		self.cycle_timestamps.append(now)
-		
-		# CPM calculcation
-		if len(self.cycle_timestamps) > 2:
-			dt = self.cycle_timestamps[-1] - self.cycle_timestamps[0]
-			n = len(self.cycle_timestamps) -1
-			self.cycle_speed = (n / dt) * 60
-		else:
-			self.cycle_speed = 0.0
-		
-		# ETA calculation
-		remaining = self.max_cycles - self.cycle_counter
-		if self.cycle_speed > 0:
-			self.eta_s = remaining / self.cycle_speed * 60
-		else:
-			self.eta_seconds = None
-	
-	def _on_push_completed(self):
-		"""Compute timing stats when a pushing phase completes."""
-		
-		if self.push_start is None:
-			return
-		
-		duration = time.time() - self.push_start
-		self.last_push_duration = duration
-		
-		self.push_times.append(duration)
-		
-		if len(self.push_times) > 0:
-			self.avg_push_duration = sum(self.push_times) / len(self.push_times)
-		else:
-			self.avg_push_duration = None
-	
-	
 	### -- STATE MACHINES -- ###	
 	def _state_idle(self, force):
 		self.states["FIO0"] = 0
@@ -98,7 +84,9 @@ class BrakeBenchController(BaseController):
 	
 	def _state_pushing(self, force):
 		if self.push_start is None:
-			self.push_start = time.time()
+			self.push_start = self.clock()
+		
+		self._track_peak(force)
 		
 		if force < self.target_up:
 			self.last_force = force
@@ -113,12 +101,22 @@ class BrakeBenchController(BaseController):
 		return None
 	
 	def _state_wait_after_push(self, force):
-		if time.time() - self.phase_start > self.rest_time:
+		self._track_peak(force)
+		
+		if self.clock() - self.phase_start > self.rest_time:
+			self.peak_force.update(self.push_peak)
+			self.push_peak = None
+			
 			self.states["FIO0"] = 1
 			self.states["FIO1"] = 0
 			return self.transition("pulling")
 		return None
 	
+	def _track_peak(self, force):
+		"""Peak force of the current push (pushing + wait_after_push)"""
+		if self.push_peak is None or force < self.push_peak:
+			self.push_peak = force
+	
 	def _state_pulling(self, force):
 		if force > self.target_down:
 			self.states["FIO0"] = 1
@@ -127,7 +125,7 @@ class BrakeBenchController(BaseController):
 		return None
 	
 	def _state_wait_after_pull(self, force):
-		if time.time() - self.phase_start > self.rest_time:
+		if self.clock() - self.phase_start > self.rest_time:
 			self.cycle_counter += 1
 			self._on_cycle_completed()
 			
@@ -157,6 +155,8 @@ class BrakeBenchController(BaseController):
 		if force is None:
 			return self.states.copy()
 		
+		self.observe(force)
+		
 		handler = self.handler[self.phase]
 		new_phase = handler(force)
 		
@@ -0,0 +1,131 @@
+# controllers/features.py
+
+import csv
+import math
+import os
+
+from array import array
+
+
+class CycleTable:
+	"""
+	Array-backed table of per-cycle features (one array('d') per column).
+	If path is given, each row is also appended to a CSV file as soon as it is complete.
+	"""
+
+	def __init__(self, columns, path=None):
+		self.columns = list(columns)
+		self.data = {c: array("d") for c in self.columns}
+		self.path = path
+		self._f = None
+		self._writer = None
+
+	def __len__(self):
+		return len(self.data[self.columns[0]])
+
+	def append(self, row: dict):
+		for c in self.columns:
+			v = row.get(c)
+			self.data[c].append(math.nan if v is None else v)
+
+		if self.path:
+			if self._f is None:
+				self._f = open(self.path, "w", newline="")
+				self._writer = csv.DictWriter(self._f, fieldnames=self.columns, extrasaction="ignore")
+				self._writer.writeheader()
+			self._writer.writerow(row)
+			self._f.flush()
+
+	def column(self, name):
+		"""Returns the array of a feature (NaN for missing values)"""
+		return self.data[name]
+
+	def last(self):
+		"""Returns the last completed cycle as a dict (or None)"""
+		if not len(self):
+			return None
+		return {c: self.data[c][-1] for c in self.columns}
+
+	def close(self):
+		if self._f is not None:
+			self._f.close()
+			self._f = None
+
+
+class CycleFeatureExtractor:
+	"""
+	Online per-cycle feature extraction, driven by BaseController.transition.
+	A cycle starts when start_phase is entered and ends at the next start (or end_of_test).
+	Features: cycle number, start time, duration, time spent in each phase (t_<phase>),
+	signal min/max over the cycle and time from cycle start until target(value) is first true.
+	"""
+
+	def __init__(self, start_phase="pushing", target=None, path=None):
+		self.start_phase = start_phase
+		self.target = target
+		self.path = path
+		self.table = None
+		self.controller = None
+		self._cur = None
+
+
+	def attach(self, controller):
+		"""Builds the table columns from the controller phases"""
+
+		self.controller = controller
+		phases = [p for p in controller.handler if p not in ("idle", "end_of_test")]
+		columns = ["cycle", "start", "duration", *[f"t_{p}" for p in phases], "sig_min", "sig_max", "t_target"]
+		self.table = CycleTable(columns, self.path)
+
+
+	def on_transition(self, old_phase, new_phase, t):
+		cur = self._cur
+
+		if cur is not None and old_phase is not None:
+			key = f"t_{old_phase}"
+			cur[key] = cur.get(key, 0.0) + t - cur["_phase_t"]
+
+		if new_phase in (self.start_phase, "end_of_test"):
+			if cur is not None:
+				cur["duration"] = t - cur["start"]
+				self.table.append({k: v for k, v in cur.items() if not k.startswith("_")})
+				cur = None
+
+			if new_phase == self.start_phase:
+				cur = {
+					"cycle": getattr(self.controller, "cycle_counter", len(self.table) + 1),
+					"start": t,
+					"sig_min": None,
+					"sig_max": None,
+					"t_target": None
+					}
+
+		if cur is not None:
+			cur["_phase_t"] = t
+		self._cur = cur
+
+
+	def observe(self, value, t):
+		"""Feeds one signal sample (e.g. loadcell force) of the current cycle"""
+
+		cur = self._cur
+		if cur is None or value is None:
+			return
+
+		if cur["sig_min"] is None or value < cur["sig_min"]:
+			cur["sig_min"] = value
+		if cur["sig_max"] is None or value > cur["sig_max"]:
+			cur["sig_max"] = value
+
+		if cur["t_target"] is None and self.target is not None and self.target(value):
+			cur["t_target"] = t - cur["start"]
+
+
+	def close(self):
+		if self.table is not None:
+			self.table.close()
+
+
+def cycles_path(save_dir, save_file):
+	"""Cycle table file written next to a raw log: <save_file stem>_cycles.csv"""
+	return os.path.join(save_dir, os.path.splitext(save_file)[0] + "_cycles.csv")
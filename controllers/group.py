@@ -0,0 +1,169 @@
+# controllers/group.py
+
+from typing import Dict, Any
+
+
+class ControllerGroup:
+	"""
+	Several bench controllers driven by one acquisition loop (one device, one read per tick).
+	Seen by the acquisition loop as a single controller:
+	- required_inputs: union of every controller inputs (read once per tick)
+	- states: every controller outputs (conflicting output pins raise ValueError at startup)
+	- report_fields: each controller report fields, prefixed "<name>." in the merged row
+	- compute(): fans the inputs out to each controller and merges the outputs
+	- phase: "end_of_test" once every controller reached its own end of test
+	pin_maps (optional) {name: {controller pin: device pin}} moves a controller to other pins,
+	e.g. two benches both written for FIO0/FIO1.
+	Controllers are also reachable as attributes (group.brake), e.g. for HMI fields "brake.phase".
+	Feature extractors are attached per controller (attach_features({name: extractor})).
+	"""
+
+	def __init__(self, controllers, pin_maps=None):
+
+		self.controllers = dict(controllers)
+		pin_maps = pin_maps or {}
+
+		self._io = {}			# name -> (inputs, outputs, report fields, identity pin map)
+		owners = {}				# device output pin -> controller name
+		readers = {}			# device input pin -> controller names
+
+		for name, ctrl in self.controllers.items():
+			if hasattr(self, name):
+				raise ValueError(f"Invalid controller name '{name}'.")
+			setattr(self, name, ctrl)
+
+			pmap = pin_maps.get(name, {})
+			ins = [(pin, pmap.get(pin, pin)) for pin in ctrl.required_inputs]
+			outs = [(pin, pmap.get(pin, pin)) for pin in ctrl.states]
+			report = [(field, f"{name}.{field}") for field in getattr(ctrl, "report_fields", [])]
+
+			for pin, dev_pin in outs:
+				if dev_pin in owners:
+					raise ValueError(f"Output pin conflict: {dev_pin} driven by '{owners[dev_pin]}' and '{name}'.")
+				owners[dev_pin] = name
+			for pin, dev_pin in ins:
+				readers.setdefault(dev_pin, []).append(name)
+
+			self._io[name] = (ins, outs, report, not pmap)
+
+		for dev_pin, names in readers.items():
+			if dev_pin in owners:
+				raise ValueError(f"Pin conflict: {dev_pin} is an output of '{owners[dev_pin]}' and an input of {names}.")
+
+		self.required_inputs = list(readers)
+		self.report_fields = [prefixed for io in self._io.values() for field, prefixed in io[2]]
+		self.report_kinds = {
+			f"{name}.{field}": kind
+			for name, ctrl in self.controllers.items()
+			for field, kind in getattr(ctrl, "report_kinds", {}).items()
+			}
+
+		# Separate log stream of each controller: (name, [(merged row key, own row key)])
+		self.streams = [
+			(name, [
+				("Timestamp", "Timestamp"),
+				("TimeABS", "TimeABS"),
+				*[(dev_pin, pin) for pin, dev_pin in ins],
+				*[(dev_pin, pin) for pin, dev_pin in outs],
+				*[(prefixed, field) for field, prefixed in report]
+				])
+			for name, (ins, outs, report, identity) in self._io.items()
+			]
+
+		# HMI rows of every controller, prefixed with its name
+		self.hmi_fields = []
+		for name, ctrl in self.controllers.items():
+			self.hmi_fields.append(None)
+			for f in getattr(ctrl, "hmi_fields", [("Phase", "phase", "{}")]):
+				self.hmi_fields.append(None if f is None else (f"{name} {f[0]}", f"{name}.{f[1]}", f[2]))
+		self.hmi_fields = self.hmi_fields[1:]
+
+
+	@property
+	def states(self):
+		"""Merged persistent outputs {device pin: value}"""
+		out = {}
+		for name, ctrl in self.controllers.items():
+			for pin, dev_pin in self._io[name][1]:
+				out[dev_pin] = ctrl.states[pin]
+		return out
+
+
+	@property
+	def phase(self):
+		if all(ctrl.phase == "end_of_test" for ctrl in self.controllers.values()):
+			return "end_of_test"
+		return "running"
+
+
+	@property
+	def cycle_counter(self):
+		return {name: ctrl.cycle_counter for name, ctrl in self.controllers.items()}
+
+
+	def attach_features(self, extractors):
+		"""One feature extractor (own cycle table) per controller: {name: CycleFeatureExtractor}"""
+		for name, extractor in extractors.items():
+			self.controllers[name].attach_features(extractor)
+		return extractors
+
+
+	@property
+	def features(self):
+		"""Feature extractors attached to the controllers, closed together (None if none)"""
+		attached = [ctrl.features for ctrl in self.controllers.values() if getattr(ctrl, "features", None) is not None]
+		return FeatureSet(attached) if attached else None
+
+
+	def set_clock(self, clock):
+		"""Same clock for every controller"""
+		for ctrl in self.controllers.values():
+			ctrl.set_clock(clock)
+
+
+	def sample_period(self):
+		"""Shortest period requested by the controllers (None: loop interval)"""
+		periods = [ctrl.sample_period() for ctrl in self.controllers.values()]
+		if any(p is None for p in periods):
+			return None
+		return min(periods)
+
+
+	def wake_deadline(self):
+		deadlines = [d for d in (ctrl.wake_deadline() for ctrl in self.controllers.values()) if d is not None]
+		return min(deadlines) if deadlines else None
+
+
+	def compute(self, inputs: Dict[str, float]) -> Dict[str, Any]:
+		"""Runs every controller on the same inputs and merges their outputs"""
+
+		outputs = {}
+		for name, ctrl in self.controllers.items():
+			ins, outs, report, identity = self._io[name]
+
+			# Identity pin map: the shared inputs dict is passed as is
+			own = inputs if identity else {pin: inputs.get(dev_pin) for pin, dev_pin in ins}
+			result = ctrl.compute(own)
+
+			for pin, dev_pin in outs:
+				outputs[dev_pin] = result.get(pin)
+			for field, prefixed in report:
+				outputs[prefixed] = result.get(field)
+
+		return outputs
+
+
+	def split_row(self, row):
+		"""Splits a merged row into each controller own row: [(name, row)]"""
+		return [(name, {own: row.get(key) for key, own in keys}) for name, keys in self.streams]
+
+
+class FeatureSet:
+	"""Feature extractors of a ControllerGroup, with the single extractor close()"""
+
+	def __init__(self, extractors):
+		self.extractors = extractors
+
+	def close(self):
+		for extractor in self.extractors:
+			extractor.close()
@@ -2,12 +2,13 @@
 
 from .base import BaseController
 from typing import Dict, Any
-from collections import deque
 import time
 
 class TrimBenchController(BaseController):
 	
-	def __init__(self, max_cycles=10000, rest_time=1.0):
+	def __init__(self, max_cycles=10000, rest_time=1.0, idle_period=0.25, clock=time.time):
+		
+		super().__init__(clock)
 		
 		# Variable storage
 		self.phase = "idle"
@@ -16,20 +17,44 @@ class TrimBenchController(BaseController):
 		self.rest_time = rest_time
 		self.phase_start = None
 		
-		# Variable for ETA and CPM
-		self.cycle_timestamps = deque(maxlen=200)
-		self.cycle_speed = 0.0
-		self.eta_s = None
-		
 		# Required inputs
 		self.required_inputs = ["FIO2", "FIO3"]
 		
+		# Extra outputs reported by compute (logged columns)
+		self.report_fields = ["phase", "cycle_count", "cycle_cpm", "eta_s"]
+		self.report_kinds = {"phase": "str", "cycle_count": "int"}
+		
+		# HMI rows: (label, attribute, format) or None for a separator
+		self.hmi_fields = [
+			("Cycle", "cycle_counter", "{}"),
+			("Phase", "phase", "{}"),
+			("Cycle speed", "cycle_speed", "{:.2f} cpm"),
+			("Push AVG", "avg_push_duration", "{:.2f}s"),
+			("Push time", "push_time", lambda st: st.describe()),
+			("Cycle time", "cycle_time", lambda st: st.describe()),
+			None,
+			("ETA", "eta_s", lambda s: f"{s/60:.1f}min"),
+			("ETA band", "eta_band", lambda b: f"{b[0]/60:.1f} - {b[1]/60:.1f}min")
+			]
+		
 		# Initialise outputs states at 1 (rest - inverted because of relay board)
 		self.states = {
 			"FIO0": 1,
 			"FIO1": 1
 			}
 		
+		# Sampling: loop interval while moving, idle_period while resting,
+		# with a wake-up exactly at the end of each rest
+		self.sample_periods = {
+			"wait_after_push": idle_period,
+			"wait_after_pull": idle_period,
+			"end_of_test": idle_period
+			}
+		self.phase_timeouts = {
+			"wait_after_push": rest_time,
+			"wait_after_pull": rest_time
+			}
+		
 		# State handler for more clarity
 		self.handler = {
 			"idle": self._state_idle,
@@ -41,29 +66,6 @@ class TrimBenchController(BaseController):
 			}
 	
 	
-	### -- Fonction for statistics -- ###
-	def _on_cycle_completed(self):
-		"""Fucntion called when a cycle finishes."""
-		
-		now = time.time()
-		self.cycle_timestamps.append(now)
-		
-		# CPM calculcation
-		if len(self.cycle_timestamps) > 2:
-			dt = self.cycle_timestamps[-1] - self.cycle_timestamps[0]
-			n = len(self.cycle_timestamps) -1
-			self.cycle_speed = (n / dt) * 60
-		else:
-			self.cycle_speed = 0.0
-		
-		# ETA calculation
-		remaining = self.max_cycles - self.cycle_counter
-		if self.cycle_speed > 0:
-			self.eta_s = remaining / self.cycle_speed * 60
-		else:
-			self.eta_seconds = None
-	
-	
 	### -- STATE MACHINES -- ###	
 	def _state_idle(self, switches):
 		self.states["FIO0"] = 1
@@ -72,14 +74,21 @@ class TrimBenchController(BaseController):
 		return self.transition("pushing")
 	
 	def _state_pushing(self, switches):
+		if self.push_start is None:
+			self.push_start = self.clock()
+		
 		if switches["push_end"]:
 			self.states["FIO0"] = 0
 			self.states["FIO1"] = 0
+			
+			self._on_push_completed()
+			self.push_start = None
+			
 			return self.transition("wait_after_push")
 		return None
 	
 	def _state_wait_after_push(self, switches):
-		if time.time() - self.phase_start > self.rest_time:
+		if self.clock() - self.phase_start > self.rest_time:
 			self.states["FIO0"] = 0
 			self.states["FIO1"] = 1
 			return self.transition("pulling")
@@ -93,7 +102,7 @@ class TrimBenchController(BaseController):
 		return None
 	
 	def _state_wait_after_pull(self, switches):
-		if time.time() - self.phase_start > self.rest_time:
+		if self.clock() - self.phase_start > self.rest_time:
 			self.cycle_counter += 1
 			self._on_cycle_completed()
 			
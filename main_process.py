@@ -0,0 +1,162 @@
+# main_process.py
+#
+# Process-based runtime: acquisition and control run alone in this process,
+# logging, plotting and HMI run in worker processes (see threads/processes.py).
+
+import multiprocessing as mp
+import os
+import threading
+import time
+
+from LabJackU6 import LabJackU6Controller
+from controllers.trim_bench import TrimBenchController
+from controllers.features import CycleFeatureExtractor, cycles_path
+from threads.acquisition import loop_acquisition
+from threads.plan import AcquisitionPlan
+from threads.instrumentation import LoopInstrumentation
+from threads.hmi import HmiView
+from threads.ringbuffer import SharedRing, ring_schema
+from threads.processes import proc_logging, proc_plotting, proc_hmi, loop_status
+
+
+def main():
+
+	# Time start snapshot
+	start_t = time.time()
+
+	# Object instantiation
+	lj = LabJackU6Controller(
+		log_dir = "logs/",
+		log_file = "LabJackU6_Test.log",
+		trace_size = 4096
+	)
+
+	# LoadCell initialisation
+	lj.add_loadcell(
+		name = "LC0",
+		ain_pos = "AIN0",
+		ain_neg = "AIN1",
+		exc = 5.0,
+		rated_F = 2224.91,	#Newtons (Load cell is 500lbs = 22224.81N)
+		mVperV = 0.003,
+		gain_idx = 3
+		)
+	tare = lj.tare_loadcells(samples = 50, max_noise = 1e-4)	# every loadcell in one batched capture
+	
+	# A rejected or failed tare leaves the offset at 0: the test is not started
+	failed = [name for name, ok in tare.items() if not ok]
+	if failed:
+		print(f"[TARE] Tare failed for {', '.join(failed)} (see the LabJack log). Check the loadcell is unloaded and wired, then restart.")
+		lj.close(1)
+		return
+
+	# DataLogger is built inside the logging process
+	dl_kwargs = dict(
+		save_file = "BrakeTest_02.csv",
+		save_dir = "logs/",
+		autosave_interval = 300,
+		autosave_file = "BrakeTest_autosave_02.csv",
+		incremental = True,
+		memory_limit = 256 * 1024**2,
+		wal = True
+		)
+
+	ctrl = TrimBenchController(
+		max_cycles=10,
+		rest_time=0.001
+	)
+
+	ctrl.attach_features(CycleFeatureExtractor(path = cycles_path("logs/", "BrakeTest_02.csv")))
+
+	# DIO directions
+	lj.set_dio_direction("FIO0", "output")
+	lj.set_dio_direction("FIO1", "output")
+	lj.set_dio_direction("FIO2", "input")
+	lj.set_dio_direction("FIO3", "input")
+
+	plan = AcquisitionPlan(lj, ctrl)
+	instr = LoopInstrumentation(interval = 0.05)
+
+	# Every row is published once in a shared-memory ring read by both workers
+	# (threads.processes.BatchPipe is the alternative without shared memory)
+	ring = SharedRing(ring_schema(plan), capacity = 2**16)
+	status_q = mp.Queue(maxsize = 2)
+	view = HmiView(ctrl, instr, None, "Trim Bench MONITOR")
+
+	# Events: acquisition (this process) and workers are stopped separately, in order
+	running = threading.Event()
+	workers_running = mp.Event()
+	running.set()
+	workers_running.set()
+
+	# Worker processes
+	log_p = mp.Process(
+		target = proc_logging,
+		args = (ring.spec(), workers_running, dl_kwargs),
+		name = "logging"
+		)
+
+	plt_p = mp.Process(
+		target = proc_plotting,
+		args = (ring.spec(), workers_running, "plot_02.html", "logs/", 300),
+		name = "plotting"
+		)
+
+	hmi_p = mp.Process(
+		target = proc_hmi,
+		args = (status_q, workers_running, view.title, view.rows, view.label_width),
+		name = "hmi"
+		)
+
+	# Acquisition side threads
+	acq_th = threading.Thread(
+		target = loop_acquisition,
+		args = (lj, ctrl, ring, None, running, start_t, instr.interval, plan, instr),
+		daemon = True
+		)
+
+	status_th = threading.Thread(
+		target = loop_status,
+		args = (view, status_q, running, 0.1),
+		daemon = True
+		)
+
+	# Starting workers first (ready before the first rows)
+	log_p.start()
+	plt_p.start()
+	hmi_p.start()
+	acq_th.start()
+	status_th.start()
+	print("Processes started. Press CTRL+C to stop.")
+
+	# Main loop
+	try:
+		while ctrl.phase != "end_of_test":
+			time.sleep(0.1)
+
+	except KeyboardInterrupt:
+		print("\nKeyboard interrupt. Stopping ...")
+
+	finally:
+		# 1. Stop acquisition, 2. send the last rows, 3. let workers finish (final save_csv)
+		running.clear()
+		acq_th.join()
+		status_th.join()
+
+		ring.close()
+		workers_running.clear()
+
+		log_p.join()
+		plt_p.join()
+		hmi_p.join()
+
+		print(instr.report())
+		instr.save_json(os.path.join("logs/", "BrakeTest_02_timing.json"))
+		ring.release()
+
+		ctrl.features.close()
+		lj.close(1)
+
+
+if __name__ == "__main__":
+	main()
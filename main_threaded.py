@@ -1,7 +1,6 @@
 # main_threaded.py
 
 import threading
-import queue
 import time
 
 from collections import deque
@@ -10,7 +9,12 @@ from LabJackU6 import LabJackU6Controller
 from DataLogger import DataLogger
 from controllers.brake_bench import BrakeBenchController
 from controllers.trim_bench import TrimBenchController
+from controllers.features import CycleFeatureExtractor, cycles_path
+from controllers.group import ControllerGroup
 from threads.acquisition import loop_acquisition
+from threads.plan import AcquisitionPlan
+from threads.ringbuffer import SharedRing, ring_schema
+from threads.instrumentation import LoopInstrumentation
 from threads.logging import loop_logging
 from threads.plotting import loop_plotting
 from threads.hmi import loop_hmi_brake, loop_hmi_trim
@@ -24,14 +28,37 @@ def main():
 	# Object instantiation
 	lj = LabJackU6Controller(
 		log_dir = "logs/",
-		log_file = "LabJackU6_Test.log"
+		log_file = "LabJackU6_Test.log",
+		trace_size = 4096		# ring buffer of device calls, dumped to logs/ on error
 	)
+
+	# LoadCell initialisation
+	lj.add_loadcell(
+		name = "LC0",
+		ain_pos = "AIN0",
+		ain_neg = "AIN1",
+		exc = 5.0,
+		rated_F = 2224.91,	#Newtons (Load cell is 500lbs = 22224.81N)
+		mVperV = 0.003,
+		gain_idx = 3
+		)
+	tare = lj.tare_loadcells(samples = 50, max_noise = 1e-4)	# every loadcell in one batched capture
+	
+	# A rejected or failed tare leaves the offset at 0: the test is not started
+	failed = [name for name, ok in tare.items() if not ok]
+	if failed:
+		print(f"[TARE] Tare failed for {', '.join(failed)} (see the LabJack log). Check the loadcell is unloaded and wired, then restart.")
+		lj.close(1)
+		return
 	
 	dl = DataLogger(
 		save_file = "BrakeTest_02.csv",
 		save_dir = "logs/",
 		autosave_interval = 300,
-		autosave_file = "BrakeTest_autosave_02.csv"
+		autosave_file = "BrakeTest_autosave_02.csv",
+		incremental = True,
+		memory_limit = 256 * 1024**2,	# bytes of rows kept in RAM before spilling to disk
+		wal = True						# crash-safe write-ahead log (tools/wal_recover.py)
 		)
 		
 	# ctrl = BrakeBenchController(
@@ -46,17 +73,34 @@ def main():
 		rest_time=0.001
 	)
 
-	# LoadCell initialisation
-	lj.add_loadcell(
-		name = "LC0",
-		ain_pos = "AIN0",
-		ain_neg = "AIN1",
-		exc = 5.0,
-		rated_F = 2224.91,	#Newtons (Load cell is 500lbs = 22224.81N)
-		mVperV = 0.003,
-		gain_idx = 3
-		)
-	lj.tare_loadcell("LC0")
+	# Both benches at once on this U6 (brake relays moved to FIO4/FIO5):
+	# brake_ctrl = BrakeBenchController(target_up = -111, target_down = -5, max_cycles = 50000, rest_time = 0.35)
+	# trim_ctrl = TrimBenchController(max_cycles = 10, rest_time = 0.001)
+	# ctrl = ControllerGroup(
+	# 	{"brake": brake_ctrl, "trim": trim_ctrl},
+	# 	pin_maps = {"brake": {"FIO0": "FIO4", "FIO1": "FIO5"}}
+	# 	)
+	# The group ends when every bench reached its own end_of_test. The ring below then carries
+	# the merged rows; for one log per bench, pass RowRouter(ctrl, queues) instead of ring to
+	# loop_acquisition, with one loop_logging thread (and DataLogger) per queue:
+	# from threads.queues import SampleQueue, RowRouter
+	# queues = {name: SampleQueue(maxsize = 200000, policy = "count_and_drop") for name in ctrl.controllers}
+
+	# Per-cycle features (cycle table written next to the raw log, one table per bench for a group)
+	if isinstance(ctrl, ControllerGroup):
+		ctrl.attach_features({
+			name: CycleFeatureExtractor(path = cycles_path("logs/", f"BrakeTest_02_{name}.csv"))
+			for name in ctrl.controllers
+			})
+	else:
+		ctrl.attach_features(CycleFeatureExtractor(
+			path = cycles_path("logs/", "BrakeTest_02.csv"),
+			# target = lambda force: force < ctrl.target_up	# brake bench: time to reach target_up
+			))
+
+	# Hardware-timed stream of LC0 (optional, acquisition then uses the latest streamed sample)
+	# lj.configure_stream(["LC0"], scan_frequency = 1000)
+	# lj.start_stream()
 
 	# DIO directions
 	lj.set_dio_direction("FIO0", "output")
@@ -64,9 +108,22 @@ def main():
 	lj.set_dio_direction("FIO2", "input")
 	lj.set_dio_direction("FIO3", "input")
 
-	# Data Queue & Buffer
-	data_q = queue.Queue()
-	plot_q = queue.Queue()
+	# Acquisition plan (compiled once, rejects unsupported pins before starting)
+	plan = AcquisitionPlan(lj, ctrl)
+	
+	# Several U6 boards (controller pins addressed as "dev:pin", e.g. "B:FIO2"):
+	# from threads.multi import DeviceGroup, MultiDevicePlan
+	# group = DeviceGroup.open({"A": 360012345, "B": 360012346}, log_dir = "logs/")
+	# plan = MultiDevicePlan(group, ctrl, start_t)	# then pass group instead of lj to loop_acquisition
+
+	# Data ring: each row is published once, every consumer reads it with its own cursor
+	# (overwritten rows are counted as dropped by the slow consumer)
+	ring = SharedRing(ring_schema(plan), capacity = 2**16)
+	data_q = ring.reader()
+	# plot_q = ring.reader()		# for plt_th or dash_th below
+
+	# Acquisition loop timing (shown on HMI, reported and saved by the logging thread)
+	instr = LoopInstrumentation(interval = 0.05)
 
 	# Thread Events
 	running = threading.Event()
@@ -76,13 +133,13 @@ def main():
 	# Threads Definition
 	acq_th = threading.Thread(
 		target = loop_acquisition,
-		args = (lj, ctrl, data_q, plot_q, running, start_t, 0.05),
+		args = (lj, ctrl, ring, None, running, start_t, instr.interval, plan, instr),
 		daemon = True
 		)
 
 	log_th = threading.Thread(
 		target = loop_logging,
-		args = (dl, data_q, running, save_event),
+		args = (dl, data_q, running, save_event, 5000, instr),
 		daemon = True
 		)
 	
@@ -92,9 +149,17 @@ def main():
 	# 	daemon = True
 	# 	)
 	
+	# Live dashboard on http://127.0.0.1:8050/ (alternative to plt_th, also fed by plot_q)
+	# from threads.dashboard import loop_dashboard
+	# dash_th = threading.Thread(
+	# 	target = loop_dashboard,
+	# 	args = (plot_q, ctrl, running, "127.0.0.1", 8050),
+	# 	daemon = True
+	# 	)
+	
 	hmi_th = threading.Thread(
 		target = loop_hmi_trim,
-		args = (ctrl, running, 1.0),
+		args = (ctrl, running, 0.1, instr, data_q),
 		daemon = True
 		)
 
@@ -103,6 +168,7 @@ def main():
 	acq_th.start()
 	log_th.start()
 	#plt_th.start()
+	#dash_th.start()
 	print("Threads started. Press CTRL+C to stop.")
 	
 
@@ -120,9 +186,14 @@ def main():
 		
 		hmi_th.join()
 		acq_th.join()
+		ring.close()		# consumers finish once they read the last rows
 		log_th.join()
 		#plt_th.join()
+		#dash_th.join()
 		
+		ring.release()
+		if ctrl.features is not None:
+			ctrl.features.close()
 		lj.close(1)
 
 
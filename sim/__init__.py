@@ -0,0 +1,6 @@
+# sim/__init__.py
+
+from .device import SimulatedU6, LatencyModel
+from .plants import Plant, BrakePlant, TrimPlant
+
+__all__ = ["SimulatedU6", "LatencyModel", "Plant", "BrakePlant", "TrimPlant"]
@@ -0,0 +1,109 @@
+# sim/bench.py
+#
+# Runs the acquisition loop against a SimulatedU6 (no hardware) and reports loop rate.
+# Usage: python -m sim.bench brake|trim|both [duration_s] [interval_s] [latency_s]
+
+import sys
+import time
+import queue
+import threading
+
+from LabJackU6 import LabJackU6Controller
+from controllers.brake_bench import BrakeBenchController
+from controllers.trim_bench import TrimBenchController
+from controllers.group import ControllerGroup
+from threads.acquisition import loop_acquisition
+from threads.instrumentation import LoopInstrumentation
+from .device import SimulatedU6, LatencyModel
+from .plants import BrakePlant, TrimPlant
+
+
+def build(bench, latency=0.001, jitter=0.0002, log_dir="logs/", clock=None, **overrides):
+	"""
+	Returns (lj, controller) wired to a simulated U6 with the bench plant model.
+	clock (optional): shared by the device, plants and controllers (e.g. sim.replay.VirtualClock).
+	overrides: controller keyword arguments (e.g. rest_time, max_cycles), given to every controller.
+	"""
+
+	ctrl_kw = {"max_cycles": 10**9, **overrides}
+	if clock is not None:
+		ctrl_kw["clock"] = clock
+
+	if bench == "brake":
+		plants = [BrakePlant()]
+		ctrl = BrakeBenchController(**{"target_up": -111, "target_down": -5, "rest_time": 0.35, **ctrl_kw})
+	elif bench == "trim":
+		plants = [TrimPlant()]
+		ctrl = TrimBenchController(**{"rest_time": 0.05, **ctrl_kw})
+	elif bench == "both":
+		# Both benches on one device, brake relays moved to FIO4/FIO5
+		plants = [BrakePlant(push_pin=4, pull_pin=5), TrimPlant()]
+		ctrl = ControllerGroup(
+			{
+				"brake": BrakeBenchController(**{"target_up": -111, "target_down": -5, "rest_time": 0.35, **ctrl_kw}),
+				"trim": TrimBenchController(**{"rest_time": 0.05, **ctrl_kw})
+			},
+			pin_maps = {"brake": {"FIO0": "FIO4", "FIO1": "FIO5"}}
+			)
+	else:
+		raise ValueError(f"Unknown bench '{bench}' (expected brake, trim or both)")
+
+	dev = SimulatedU6(plants=plants, latency=LatencyModel(latency, jitter), clock=clock or time.monotonic)
+	lj = LabJackU6Controller(log_dir=log_dir, log_file="LabJackU6_sim.log", device=dev)
+
+	if bench in ("brake", "both"):
+		lj.add_loadcell("LC0", "AIN0", "AIN1", exc=5.0, rated_F=2224.91, mVperV=0.003, gain_idx=3)
+
+	return lj, ctrl
+
+
+def run(bench="brake", duration=10.0, interval=0.05, latency=0.001, jitter=0.0002):
+	"""Runs the acquisition loop for duration seconds and returns a result dict"""
+
+	lj, ctrl = build(bench, latency, jitter)
+
+	data_q = queue.Queue()
+	plot_q = queue.Queue()
+	running = threading.Event()
+	running.set()
+	instr = LoopInstrumentation(interval)
+
+	start_t = time.time()
+	acq_th = threading.Thread(
+		target = loop_acquisition,
+		args = (lj, ctrl, data_q, plot_q, running, start_t, interval, None, instr),
+		daemon = True
+		)
+	acq_th.start()
+	time.sleep(duration)
+	running.clear()
+	acq_th.join()
+	elapsed = time.time() - start_t
+
+	ticks = data_q.qsize()
+	result = {
+		"bench": bench,
+		"ticks": ticks,
+		"rate_hz": ticks / elapsed,
+		"round_trips_per_tick": lj.d.round_trips / ticks if ticks else None,
+		"usb_time_per_tick_ms": lj.d.usb_time / ticks * 1e3 if ticks else None,
+		"cycles": ctrl.cycle_counter,
+		"overruns": instr.missed,
+		"timing": instr,
+		}
+
+	lj.close(1)
+	return result
+
+
+if __name__ == "__main__":
+	bench = sys.argv[1] if len(sys.argv) > 1 else "brake"
+	duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+	interval = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+	latency = float(sys.argv[4]) if len(sys.argv) > 4 else 0.001
+
+	res = run(bench, duration, interval, latency)
+	timing = res.pop("timing")
+	for k, v in res.items():
+		print(f"{k:<22}: {v}")
+	print(timing.report())
@@ -0,0 +1,233 @@
+# sim/device.py
+
+import time
+import random
+
+
+# --- Feedback command IDs (first cmdBytes byte, see U6 user guide) --- #
+FB_AIN24 = 2
+FB_BIT_STATE_READ = 10
+FB_BIT_STATE_WRITE = 11
+FB_BIT_DIR_WRITE = 13
+FB_DAC0_16 = 38
+FB_DAC1_16 = 39
+
+MAX_USB_PACKET_LENGTH = 64
+GAINS = [1, 10, 100, 1000]
+
+
+class LatencyModel:
+	"""USB round-trip latency: fixed part + gaussian jitter (seconds)"""
+
+	def __init__(self, latency=0.001, jitter=0.0002, seed=None):
+		self.latency = latency
+		self.jitter = jitter
+		self.rng = random.Random(seed)
+
+	def sample(self):
+		return max(0.0, self.latency + self.rng.gauss(0.0, self.jitter)) if self.jitter else self.latency
+
+	def wait(self):
+		delay = self.sample()
+		if delay > 0:
+			time.sleep(delay)
+		return delay
+
+
+class SimulatedU6:
+	"""
+	Drop-in replacement of u6.U6 for LabJackU6Controller(device=...).
+	Implements the calls used by the controller (getFeedback, getAIN, stream, close),
+	adds a USB round-trip latency on each transfer and routes I/O to plant models.
+	"""
+
+	def __init__(self, plants=None, latency=None, clock=time.monotonic, serial=360000000):
+		self.plants = plants or []
+		self.latency = latency or LatencyModel()
+		self.clock = clock
+		self.serialNumber = serial
+
+		self.dio_dir = [0] * 20
+		self.dio_state = [0] * 20
+		self.dac = [0.0, 0.0]
+
+		# Statistics
+		self.round_trips = 0
+		self.usb_time = 0.0
+
+		# Stream configuration
+		self.stream_cfg = None
+		self.streaming = False
+
+
+	## -- Plants routing -- ##
+
+	def _step(self):
+		now = self.clock()
+		for plant in self.plants:
+			plant.step(now)
+		return now
+
+	def _ain(self, channel, differential):
+		for plant in self.plants:
+			v = plant.read_ain(channel, differential)
+			if v is not None:
+				return v
+		return 0.0
+
+	def _dio(self, pin):
+		for plant in self.plants:
+			v = plant.read_dio(pin)
+			if v is not None:
+				return int(bool(v))
+		return self.dio_state[pin]
+
+
+	## -- Conversion -- ##
+
+	def voltageToBinary(self, gainIndex, voltage):
+		"""Inverse of binaryToCalibratedAnalogVoltage (24-bit, +-10V/gain bipolar range)"""
+
+		span = 10.0 / GAINS[gainIndex & 0x03]
+		code = int(round((voltage / span) * (1 << 23))) + (1 << 23)
+		return max(0, min((1 << 24) - 1, code))
+
+	def binaryToCalibratedAnalogVoltage(self, gainIndex, bytesVoltage, is16Bits=False, resolutionIndex=0):
+		span = 10.0 / GAINS[gainIndex & 0x03]
+		if is16Bits:
+			bytesVoltage = bytesVoltage << 8
+		return (bytesVoltage - (1 << 23)) / (1 << 23) * span
+
+	def getCalibrationData(self):
+		return None
+
+
+	## -- Command/Response -- ##
+
+	def getFeedback(self, *commandlist):
+		"""Executes Feedback commands in one simulated USB round trip"""
+
+		if len(commandlist) == 1 and isinstance(commandlist[0], list):
+			commandlist = commandlist[0]
+
+		send_len = 7 + sum(len(c.cmdBytes) for c in commandlist)
+		read_len = 9 + sum(c.readLen for c in commandlist)
+		if send_len + (send_len % 2) > MAX_USB_PACKET_LENGTH:
+			raise Exception(f"Feedback command bigger than 64 bytes ({send_len} bytes).")
+		if read_len + (read_len % 2) > MAX_USB_PACKET_LENGTH:
+			raise Exception(f"Feedback response bigger than 64 bytes ({read_len} bytes).")
+
+		self.usb_time += self.latency.wait()
+		self.round_trips += 1
+		self._step()
+
+		results = []
+		for c in commandlist:
+			b = c.cmdBytes
+			cid = b[0]
+
+			if cid == FB_AIN24:
+				gain = (b[2] >> 4) & 0x0F
+				differential = bool(b[3] & 0x80)
+				results.append(self.voltageToBinary(gain, self._ain(b[1], differential)))
+
+			elif cid == FB_BIT_STATE_READ:
+				results.append(self._dio(b[1] & 0x1F))
+
+			elif cid == FB_BIT_STATE_WRITE:
+				pin = b[1] & 0x1F
+				state = (b[1] >> 7) & 1
+				self.dio_state[pin] = state
+				for plant in self.plants:
+					plant.write_dio(pin, state)
+				results.append(None)
+
+			elif cid == FB_BIT_DIR_WRITE:
+				self.dio_dir[b[1] & 0x1F] = (b[1] >> 7) & 1
+				results.append(None)
+
+			elif cid in (FB_DAC0_16, FB_DAC1_16):
+				idx = cid - FB_DAC0_16
+				self.dac[idx] = (b[1] + (b[2] << 8)) / 65535 * 5.0
+				for plant in self.plants:
+					plant.write_dac(idx, self.dac[idx])
+				results.append(None)
+
+			else:
+				raise Exception(f"Feedback command {cid} not supported by SimulatedU6.")
+
+		return results
+
+
+	def getAIN(self, positiveChannel, resolutionIndex=0, gainIndex=0, settlingFactor=0, differential=False):
+		self.usb_time += self.latency.wait()
+		self.round_trips += 1
+		self._step()
+
+		raw = self.voltageToBinary(gainIndex, self._ain(positiveChannel, differential))
+		return self.binaryToCalibratedAnalogVoltage(gainIndex, raw)
+
+
+	## -- Stream -- ##
+
+	def streamConfig(self, NumChannels=1, ResolutionIndex=0, SamplesPerPacket=25, SettlingFactor=0, InternalStreamClockFrequency=0, DivideClockBy256=False, ScanInterval=1, ChannelNumbers=[0], ChannelOptions=[0], ScanFrequency=None, SampleFrequency=None):
+
+		if ScanFrequency is None:
+			ScanFrequency = (SampleFrequency or 1000) / NumChannels
+
+		self.stream_cfg = {
+			"channels": list(ChannelNumbers[:NumChannels]),
+			"options": list(ChannelOptions[:NumChannels]),
+			"scan_frequency": ScanFrequency,
+			"samples_per_packet": SamplesPerPacket
+			}
+
+	def streamStart(self):
+		if self.stream_cfg is None:
+			raise Exception("Stream not configured.")
+		self.latency.wait()
+		self.streaming = True
+
+	def streamStop(self):
+		self.latency.wait()
+		self.streaming = False
+
+	def streamData(self, convert=True):
+		"""Yields one converted packet-group per call, paced by the scan clock"""
+
+		cfg = self.stream_cfg
+		channels = cfg["channels"]
+		options = cfg["options"]
+		period = 1.0 / cfg["scan_frequency"]
+		scans = max(1, cfg["samples_per_packet"] // len(channels))
+
+		t = self.clock()
+		first = True
+
+		while self.streaming:
+			t_end = t + scans * period
+			delay = t_end - self.clock()
+			if delay > 0:
+				time.sleep(delay)
+
+			result = {f"AIN{ch}": [] for ch in channels}
+			for i in range(scans):
+				ts = t + i * period
+				for plant in self.plants:
+					plant.step(ts)
+				for ch, opt in zip(channels, options):
+					v = self._ain(ch, bool(opt & 0x80))
+					gain = (opt >> 4) & 0x03
+					result[f"AIN{ch}"].append(self.binaryToCalibratedAnalogVoltage(gain, self.voltageToBinary(gain, v)))
+
+			result["errors"] = 0
+			result["missed"] = 0
+			result["firstPacket"] = 0 if first else 1
+			first = False
+			t = t_end
+
+			yield result
+
+
+	def close(self):
+		self.streaming = False
@@ -0,0 +1,132 @@
+# sim/plants.py
+
+import math
+import random
+
+
+class Plant:
+	"""
+	Base plant model plugged in a SimulatedU6.
+	read_* return None when the plant is not wired to the requested pin.
+	"""
+
+	def __init__(self):
+		self.t = None
+
+	def step(self, t):
+		"""Advance the model to time t (seconds). Ignores steps back in time."""
+
+		if self.t is None:
+			self.t = t
+			return
+		dt = t - self.t
+		if dt > 0:
+			self.update(dt)
+			self.t = t
+
+	def update(self, dt):
+		pass
+
+	def read_ain(self, channel, differential):
+		return None
+
+	def read_dio(self, pin):
+		return None
+
+	def write_dio(self, pin, state):
+		pass
+
+	def write_dac(self, idx, voltage):
+		pass
+
+
+class BrakePlant(Plant):
+	"""
+	Brake bench: relay-driven actuator pressing on a loadcell (BrakeBenchController).
+	- push_pin low -> force goes toward push_force (first order, time constant tau)
+	- pull_pin low -> force goes toward pull_force
+	- both high -> force holds
+	Loadcell wired differentially on ain_pos/ain_pos+1.
+	"""
+
+	def __init__(self, ain_pos=0, push_pin=0, pull_pin=1, push_force=-150.0, pull_force=2.0, tau=0.15,
+			rated_F=2224.91, exc=5.0, mVperV=0.003, offset_v=0.0, noise=0.3, seed=None):
+
+		super().__init__()
+		self.ain_pos = ain_pos
+		self.push_pin = push_pin
+		self.pull_pin = pull_pin
+		self.push_force = push_force
+		self.pull_force = pull_force
+		self.tau = tau
+		self.scale = exc * mVperV / rated_F		# V per force unit
+		self.offset_v = offset_v
+		self.noise = noise
+		self.rng = random.Random(seed)
+
+		self.relays = {push_pin: 1, pull_pin: 1}		# inverted relay board: 1 = rest
+		self.force = 0.0
+
+	def update(self, dt):
+		push = self.relays[self.push_pin] == 0
+		pull = self.relays[self.pull_pin] == 0
+
+		if push and not pull:
+			target = self.push_force
+		elif pull and not push:
+			target = self.pull_force
+		else:
+			return
+
+		self.force += (target - self.force) * (1.0 - math.exp(-dt / self.tau))
+
+	def read_ain(self, channel, differential):
+		if channel != self.ain_pos or not differential:
+			return None
+		force = self.force + (self.rng.gauss(0.0, self.noise) if self.noise else 0.0)
+		return force * self.scale + self.offset_v
+
+	def write_dio(self, pin, state):
+		if pin in self.relays:
+			self.relays[pin] = state
+
+
+class TrimPlant(Plant):
+	"""
+	Trim bench: actuator moving between two end-of-travel switches (TrimBenchController).
+	- push_pin high & pull_pin low -> moves toward push end
+	- pull_pin high & push_pin low -> moves toward pull end
+	Switch inputs read 1 when the actuator is at the corresponding end.
+	"""
+
+	def __init__(self, push_pin=0, pull_pin=1, push_end_pin=2, pull_end_pin=3, travel_time=0.5, position=0.0):
+
+		super().__init__()
+		self.push_pin = push_pin
+		self.pull_pin = pull_pin
+		self.push_end_pin = push_end_pin
+		self.pull_end_pin = pull_end_pin
+		self.speed = 1.0 / travel_time
+		self.position = position		# 0.0 = pull end, 1.0 = push end
+
+		self.outputs = {push_pin: 1, pull_pin: 1}
+
+	def update(self, dt):
+		push = self.outputs[self.push_pin] == 1
+		pull = self.outputs[self.pull_pin] == 1
+
+		if push and not pull:
+			self.position = min(1.0, self.position + self.speed * dt)
+		elif pull and not push:
+			self.position = max(0.0, self.position - self.speed * dt)
+
+	def read_dio(self, pin):
+		if pin == self.push_end_pin:
+			return self.position >= 1.0
+		if pin == self.pull_end_pin:
+			return self.position <= 0.0
+		return None
+
+	def write_dio(self, pin, state):
+		if pin in self.outputs:
+			self.outputs[pin] = state
@@ -0,0 +1,321 @@
+# sim/replay.py
+#
+# Faster-than-real-time runs of the bench controllers on a virtual clock:
+# - replay_rows: feeds a recorded DataLogger CSV (or any synthetic trace) through compute()
+# - simulate: closed loop against the plant models, same scheduling as loop_acquisition
+# - check_live: records a live (simulated device) run with loop_acquisition and replays it
+# Usage: python -m sim.replay brake|trim|both <recorded.csv | n_cycles> [rest_time] [max_cycles]
+#        (replaying a CSV, max_cycles defaults to the cycle count at which the recording ended)
+#        python -m sim.replay check brake|trim|both [n_cycles] [runs]
+
+import csv
+import math
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+from threads.plan import AcquisitionPlan
+
+
+class VirtualClock:
+	"""Settable clock, called like time.time, injected in controllers (and SimulatedU6)"""
+
+	def __init__(self, t=0.0):
+		self.t = t
+
+	def __call__(self):
+		return self.t
+
+	def set(self, t):
+		self.t = t
+
+	def advance(self, dt):
+		self.t += dt
+
+
+def _machines(controller):
+	"""{name: state machine} (None for a single controller)"""
+	return getattr(controller, "controllers", None) or {None: controller}
+
+
+def parse_value(text):
+	"""DataLogger CSV cell -> logged value (None, bool, float or str)"""
+
+	if text is None or text == "":
+		return None
+	if text == "True" or text == "False":
+		return text == "True"
+	try:
+		return float(text)
+	except ValueError:
+		return text
+
+
+def read_csv_rows(path):
+	"""Rows of a DataLogger CSV with values parsed back (see parse_value)"""
+
+	with open(path, newline="") as f:
+		for row in csv.DictReader(f):
+			yield {k: parse_value(v) for k, v in row.items()}
+
+
+class PhaseLog:
+	"""Phase transitions seen after each compute(): [(time, controller name, cycle, old, new)]"""
+
+	def __init__(self, controller):
+		self.machines = _machines(controller)
+		self.last = {name: ctrl.phase for name, ctrl in self.machines.items()}
+		self.entries = []
+
+	def update(self, t):
+		for name, ctrl in self.machines.items():
+			if ctrl.phase != self.last[name]:
+				self.entries.append((t, name, ctrl.cycle_counter, self.last[name], ctrl.phase))
+				self.last[name] = ctrl.phase
+
+
+def recorded_max_cycles(rows, controller):
+	"""
+	{name: cycle_count on the first end_of_test row} of a recorded run (None if that controller
+	never ended). Replaying with these max_cycles ends where the recording did.
+	"""
+
+	prefixes = {name: "" if name is None else f"{name}." for name in _machines(controller)}
+	found = {}
+
+	for row in rows:
+		for name, prefix in prefixes.items():
+			if name not in found and row.get(f"{prefix}phase") == "end_of_test":
+				found[name] = row.get(f"{prefix}cycle_count")
+		if len(found) == len(prefixes):
+			break
+
+	return {name: None if found.get(name) is None else int(found[name]) for name in prefixes}
+
+
+def set_max_cycles(controller, max_cycles):
+	"""max_cycles: {name: count or None (unchanged)}, or one count for every controller"""
+
+	for name, ctrl in _machines(controller).items():
+		n = max_cycles.get(name) if isinstance(max_cycles, dict) else max_cycles
+		if n is not None:
+			ctrl.max_cycles = n
+
+
+def _discrete_outputs(controller):
+	"""Output columns compared by replay_rows: pins and non-float report fields"""
+
+	kinds = getattr(controller, "report_kinds", {})
+	return [*controller.states, *[f for f in controller.report_fields if kinds.get(f, "float") != "float"]]
+
+
+def _same(a, b):
+	if a is None or b is None:
+		return a is None and b is None
+	if isinstance(a, str) or isinstance(b, str):
+		return a == b
+	return a == b or (math.isnan(a) and math.isnan(b))
+
+
+def replay_rows(rows, controller, clock=None, time_key="TimeABS", compare=None, dl=None):
+	"""
+	Feeds rows (dicts, e.g. read_csv_rows) through controller.compute() as fast as possible.
+	Before each compute the virtual clock is set to row[time_key]. TimeABS is the TickClock
+	time the live controller saw during its compute(), so phases, pins and cycle statistics
+	are reproduced exactly.
+	- compare: output columns checked against the recorded ones (default: pins and
+	  non-float report fields; columns missing from the rows are skipped)
+	- dl (optional DataLogger): receives the recomputed rows
+	Returns a result dict (ticks, cycles, phase log, mismatches per column, speed-up).
+	"""
+
+	clock = clock or VirtualClock()
+	controller.set_clock(clock)
+
+	compare = _discrete_outputs(controller) if compare is None else compare
+	mismatches = {col: 0 for col in compare}
+	first_mismatch = None
+	log = PhaseLog(controller)
+	inputs_keys = controller.required_inputs
+
+	ticks = 0
+	t0 = t1 = None
+	wall = time.perf_counter()
+
+	for row in rows:
+		t = row[time_key]
+		clock.set(t)
+		if t0 is None:
+			t0 = t
+		t1 = t
+
+		outputs = controller.compute({k: row.get(k) for k in inputs_keys})
+		log.update(t)
+		ticks += 1
+
+		for col in compare:
+			if col in row and not _same(outputs.get(col), row[col]):
+				mismatches[col] += 1
+				if first_mismatch is None:
+					first_mismatch = (t, col, row[col], outputs.get(col))
+
+		if dl is not None:
+			dl.log({**row, **{k: v for k, v in outputs.items() if k in row}})
+
+	wall = time.perf_counter() - wall
+	span = (t1 - t0) if ticks else 0.0
+
+	return {
+		"ticks": ticks,
+		"cycles": _cycles(controller),
+		"span_s": span,
+		"wall_s": wall,
+		"speedup": span / wall if wall > 0 else None,
+		"mismatches": {col: n for col, n in mismatches.items() if n},
+		"first_mismatch": first_mismatch,
+		"phase_log": log.entries,
+		}
+
+
+def simulate(lj, controller, clock, interval=0.05, latency=0.0005, duration=None, max_ticks=None, dl=None):
+	"""
+	Closed-loop run of controller against a SimulatedU6 (built with clock, zero latency model),
+	as fast as possible. Tick scheduling is the one of loop_acquisition (sample_period,
+	wake_deadline); the virtual clock advances by latency during the read and the write.
+	Runs until end_of_test, duration (virtual seconds) or max_ticks.
+	Returns a result dict (ticks, cycles, phase log, virtual span, speed-up).
+	"""
+
+	controller.set_clock(clock)
+	plan = AcquisitionPlan(lj, controller)
+	log = PhaseLog(controller)
+
+	start_t = next_t = clock()
+	ticks = 0
+	wall = time.perf_counter()
+
+	while controller.phase != "end_of_test":
+		if duration is not None and next_t - start_t >= duration:
+			break
+		if max_ticks is not None and ticks >= max_ticks:
+			break
+
+		clock.set(max(next_t, clock()))
+		timestamp = clock() - start_t
+
+		inputs = plan.read()
+		clock.advance(latency)
+
+		time_abs = clock()
+		outputs = controller.compute(inputs)
+		log.update(time_abs)
+
+		plan.write(outputs)
+		clock.advance(latency)
+
+		row = plan.fill_row(timestamp, time_abs, inputs, outputs)
+		if dl is not None:
+			dl.log(row)
+		ticks += 1
+
+		next_t += controller.sample_period() or interval
+		deadline = controller.wake_deadline()
+		if deadline is not None and clock() < deadline < next_t:
+			next_t = deadline
+
+	wall = time.perf_counter() - wall
+	span = clock() - start_t
+
+	return {
+		"ticks": ticks,
+		"cycles": _cycles(controller),
+		"span_s": span,
+		"wall_s": wall,
+		"speedup": span / wall if wall > 0 else None,
+		"phase_log": log.entries,
+		}
+
+
+def _cycles(controller):
+	return {name: ctrl.cycle_counter for name, ctrl in _machines(controller).items()} if hasattr(controller, "controllers") else controller.cycle_counter
+
+
+def check_live(bench="brake", cycles=8, interval=0.02, latency=0.001):
+	"""
+	Live-vs-replay check: runs loop_acquisition in real time against the simulated bench
+	until end_of_test, logs it to a DataLogger CSV, then replays that CSV with a fresh controller.
+	Returns the replay result (mismatches must be empty).
+	"""
+
+	from DataLogger import DataLogger
+	from threads.acquisition import loop_acquisition
+	from .bench import build
+
+	with tempfile.TemporaryDirectory() as tmp:
+		lj, ctrl = build(bench, latency, latency / 5, log_dir=tmp, max_cycles=cycles)
+		data_q = queue.Queue()
+		running = threading.Event()
+		running.set()
+
+		acq_th = threading.Thread(
+			target = loop_acquisition,
+			args = (lj, ctrl, data_q, None, running, time.time(), interval),
+			daemon = True
+			)
+		acq_th.start()
+		while ctrl.phase != "end_of_test":
+			time.sleep(0.05)
+		running.clear()
+		acq_th.join()
+		lj.close(1)
+
+		dl = DataLogger(save_file="live.csv", save_dir=tmp)
+		while not data_q.empty():
+			dl.log(data_q.get())
+		dl.save_csv()
+
+		lj, replayed = build(bench, 0.0, 0.0, log_dir=tmp, max_cycles=cycles)
+		lj.close(1)
+		return replay_rows(read_csv_rows(os.path.join(tmp, "live.csv")), replayed)
+
+
+if __name__ == "__main__":
+	from .bench import build
+
+	if len(sys.argv) > 1 and sys.argv[1] == "check":
+		bench = sys.argv[2] if len(sys.argv) > 2 else "brake"
+		cycles = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+		runs = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+		failed = 0
+		for i in range(runs):
+			res = check_live(bench, cycles)
+			failed += bool(res["mismatches"])
+			print(f"[CHECK] {bench} run {i + 1}: {res['ticks']} ticks, cycles {res['cycles']}, mismatches {res['mismatches'] or 'none'}")
+		sys.exit(1 if failed else 0)
+
+	bench = sys.argv[1] if len(sys.argv) > 1 else "brake"
+	source = sys.argv[2] if len(sys.argv) > 2 else "1000"
+	overrides = {"rest_time": float(sys.argv[3])} if len(sys.argv) > 3 else {}
+
+	clock = VirtualClock(time.time())
+
+	if source.isdigit():
+		lj, ctrl = build(bench, latency=0.0, jitter=0.0, clock=clock, max_cycles=int(source), **overrides)
+		res = simulate(lj, ctrl, clock)
+		lj.close(1)
+	else:
+		rows = list(read_csv_rows(source))
+		lj, ctrl = build(bench, latency=0.0, jitter=0.0, clock=clock, **overrides)
+		lj.close(1)
+		set_max_cycles(ctrl, int(sys.argv[4]) if len(sys.argv) > 4 else recorded_max_cycles(rows, ctrl))
+		res = replay_rows(rows, ctrl, clock)
+
+	phase_log = res.pop("phase_log")
+	for k, v in res.items():
+		print(f"{k:<16}: {v}")
+	print(f"{'transitions':<16}: {len(phase_log)}")
+	for entry in phase_log[-5:]:
+		print("  {:.3f} {} cycle {} {} -> {}".format(*entry))
@@ -0,0 +1,8 @@
+# storage/__init__.py
+
+from .columnar import ColumnWriter, ColumnReader, export_csv
+from .rowstore import RowStore
+from .segments import SegmentWriter, read_manifest, select_segments, iter_segment_rows
+from .wal import WalWriter, read_wal, recover_csv
+
+__all__ = ["ColumnWriter", "ColumnReader", "export_csv", "RowStore", "SegmentWriter", "read_manifest", "select_segments", "iter_segment_rows", "WalWriter", "read_wal", "recover_csv"]
@@ -0,0 +1,343 @@
+# storage/columnar.py
+#
+# Columnar chunk file (.ljcol):
+#   file header : MAGIC | uint32 schema_len | schema JSON | pad to 8
+#   chunk       : b"CHNK" | uint32 n_rows | uint32 meta_len | uint32 0 | meta JSON | pad to 8
+#                 then for each column: n_rows values (fixed dtype) | pad to 8
+# Schema is fixed by the first chunk. String columns are dictionary-encoded (int32 codes,
+# -1 = None); new categories are declared in the meta of the chunk that first uses them.
+
+import csv
+import json
+import math
+import struct
+
+import numpy as np
+
+
+MAGIC = b"LJCOL\x00\x01\x00"
+CHUNK_MAGIC = b"CHNK"
+CHUNK_HEADER = struct.Struct("<4sIII")
+
+# kind -> (numpy dtype, null value)
+KINDS = {
+	"float": ("<f8", math.nan),
+	"int": ("<f8", math.nan),
+	"bool": ("i1", -1),
+	"str": ("<i4", -1),
+	}
+
+
+def _pad(n):
+	return (-n) % 8
+
+
+def value_kind(val):
+	"""Column kind of a logged value (None if it cannot be told)"""
+
+	if val is None:
+		return None
+	if isinstance(val, bool):
+		return "bool"
+	if isinstance(val, int):
+		return "int"
+	if isinstance(val, str):
+		return "str"
+	return "float"
+
+
+def widen_kind(kind, val):
+	"""Column kind once val is logged: int widens to float, otherwise the first kind is kept"""
+
+	new = value_kind(val)
+	if kind is None:
+		return new
+	if kind == "int" and new == "float":
+		return "float"
+	return kind
+
+
+def make_column(name, kind):
+	kind = kind or "float"
+	return {"name": name, "kind": kind, "dtype": KINDS[kind][0]}
+
+
+def encode_values(kind, values, codes=None, new_categories=None):
+	"""
+	Converts logged values to storable ones (null for None or mismatching types).
+	String columns use/extend codes {str: code}; new strings are appended to new_categories.
+	"""
+
+	null = KINDS[kind][1]
+
+	if kind == "str":
+		out = []
+		for v in values:
+			if v is None:
+				out.append(null)
+				continue
+			code = codes.get(v)
+			if code is None:
+				code = codes[v] = len(codes)
+				new_categories.append(v)
+			out.append(code)
+		return out
+
+	return [null if v is None or isinstance(v, str) else v for v in values]
+
+
+class ColumnWriter:
+	"""
+	Writes rows (dicts) to a columnar chunk file, one chunk every chunk_rows rows.
+	Column names come from the first row; each column kind from its first non-None value
+	(e.g. phase is None until the first successful read), widened from int to float if a float
+	follows in the first chunk (ints are stored as f8, so later floats are kept as well).
+	While a column has no value yet, the first chunk is held back, up to max_defer_chunks
+	chunks (then float if only None).
+	"""
+
+	def __init__(self, path, chunk_rows=4096, schema=None, max_defer_chunks=8):
+
+		self.path = path
+		self.chunk_rows = chunk_rows
+		self.max_defer_chunks = max_defer_chunks
+		self.schema = schema
+		self.n_rows = 0
+
+		self._f = None
+		self._names = [c["name"] for c in schema] if schema else None
+		self._pending = [[] for _ in schema] if schema else None		# raw values per column
+		self._codes = {}			# column -> {str: code}
+
+
+	def _open(self):
+
+		if self.schema is None:
+			self.schema = [make_column(name, self._infer_kind(values)) for name, values in zip(self._names, self._pending)]
+
+		self._codes = {c["name"]: {} for c in self.schema if c["kind"] == "str"}
+
+		header = json.dumps({"columns": self.schema}).encode()
+		self._f = open(self.path, "wb")
+		self._f.write(MAGIC + struct.pack("<I", len(header)) + header + b"\0" * _pad(len(MAGIC) + 4 + len(header)))
+
+
+	@staticmethod
+	def _infer_kind(values):
+		"""Kind of the first non-None value, int widened to float if a float follows"""
+
+		kind = None
+		for v in values:
+			kind = widen_kind(kind, v)
+		return kind
+
+
+	def append(self, row: dict):
+		"""Appends one row. The first row fixes the column names."""
+
+		if self._names is None:
+			self._names = list(row)
+			self._pending = [[] for _ in self._names]
+
+		for name, values in zip(self._names, self._pending):
+			values.append(row.get(name))
+
+		n = len(self._pending[0])
+		if n >= self.chunk_rows and (self.schema is not None or n >= self.chunk_rows * self.max_defer_chunks or self._kinds_known()):
+			self.flush()
+
+
+	def _kinds_known(self):
+		"""Every column has at least one non-None pending value (schema can be inferred)"""
+		return all(any(v is not None for v in values) for values in self._pending)
+
+
+	def extend(self, rows):
+		for row in rows:
+			self.append(row)
+
+
+	def flush(self):
+		"""Writes the pending rows as one chunk"""
+
+		if not self._pending or not self._pending[0]:
+			return
+
+		if self._f is None:
+			self._open()
+
+		n = len(self._pending[0])
+		new_categories = {}
+		columns = []
+
+		for col, values in zip(self.schema, self._pending):
+			new = []
+			data = np.asarray(encode_values(col["kind"], values, self._codes.get(col["name"]), new), dtype=col["dtype"]).tobytes()
+			columns.append(data)
+			columns.append(b"\0" * _pad(len(data)))
+			if new:
+				new_categories[col["name"]] = new
+
+		meta = json.dumps({"categories": new_categories}).encode()
+		header = [CHUNK_HEADER.pack(CHUNK_MAGIC, n, len(meta), 0), meta, b"\0" * _pad(len(meta))]
+
+		self._f.write(b"".join(header + columns))
+		self._f.flush()
+
+		self.n_rows += n
+		self._pending = [[] for _ in self._names]
+
+
+	def close(self):
+		self.flush()
+		if self._f is not None:
+			self._f.close()
+			self._f = None
+
+
+class ColumnReader:
+	"""
+	Memory-mapped reader of a columnar chunk file.
+	column(name, start, stop) only touches the chunks covering [start, stop).
+	A truncated last chunk (crash while writing) is ignored.
+	"""
+
+	def __init__(self, path):
+
+		self.path = path
+		self._mm = np.memmap(path, mode="r", dtype=np.uint8)
+		buf = self._mm
+
+		if bytes(buf[:len(MAGIC)]) != MAGIC:
+			raise ValueError(f"{path} is not a columnar chunk file")
+
+		pos = len(MAGIC)
+		(schema_len,) = struct.unpack_from("<I", buf, pos)
+		pos += 4
+		self.schema = json.loads(bytes(buf[pos:pos + schema_len]))["columns"]
+		pos += schema_len + _pad(len(MAGIC) + 4 + schema_len)
+
+		self.columns = [c["name"] for c in self.schema]
+		self._col = {c["name"]: i for i, c in enumerate(self.schema)}
+		self.categories = {c["name"]: [] for c in self.schema if c["kind"] == "str"}
+
+		# Chunk index: (first_row, n_rows, [column offsets])
+		self.chunks = []
+		self.n_rows = 0
+		size = len(buf)
+
+		while pos + CHUNK_HEADER.size <= size:
+			magic, n, meta_len, _ = CHUNK_HEADER.unpack_from(buf, pos)
+			if magic != CHUNK_MAGIC:
+				break
+
+			p = pos + CHUNK_HEADER.size
+			meta = json.loads(bytes(buf[p:p + meta_len]))
+			p += meta_len + _pad(meta_len)
+
+			offsets = []
+			for c in self.schema:
+				offsets.append(p)
+				nbytes = n * np.dtype(c["dtype"]).itemsize
+				p += nbytes + _pad(nbytes)
+
+			if p > size:
+				break
+
+			for name, cats in meta.get("categories", {}).items():
+				self.categories[name].extend(cats)
+
+			self.chunks.append((self.n_rows, n, offsets))
+			self.n_rows += n
+			pos = p
+
+
+	def __len__(self):
+		return self.n_rows
+
+
+	def _chunk_view(self, chunk, col_idx):
+		first, n, offsets = chunk
+		dtype = np.dtype(self.schema[col_idx]["dtype"])
+		return np.frombuffer(self._mm, dtype=dtype, count=n, offset=offsets[col_idx])
+
+
+	def column(self, name, start=0, stop=None, decode=False):
+		"""
+		Returns column values for rows [start, stop) as a numpy array.
+		- decode: for string columns, returns an object array of strings (None for missing)
+		"""
+
+		idx = self._col[name]
+		stop = self.n_rows if stop is None else min(stop, self.n_rows)
+		parts = []
+
+		for chunk in self.chunks:
+			first, n, _ = chunk
+			if first + n <= start or first >= stop:
+				continue
+			view = self._chunk_view(chunk, idx)
+			parts.append(view[max(0, start - first):min(n, stop - first)])
+
+		dtype = np.dtype(self.schema[idx]["dtype"])
+		values = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+		if decode and self.schema[idx]["kind"] == "str":
+			lut = np.array(self.categories[name] + [None], dtype=object)
+			return lut[values]		# code -1 picks the trailing None
+		return values
+
+
+	def rows(self, start=0, stop=None):
+		"""Iterates rows as dicts (same values as the original log rows)"""
+
+		stop = self.n_rows if stop is None else min(stop, self.n_rows)
+
+		for chunk in self.chunks:
+			first, n, _ = chunk
+			if first + n <= start or first >= stop:
+				continue
+
+			lo = max(0, start - first)
+			hi = min(n, stop - first)
+			cols = []
+			for i, c in enumerate(self.schema):
+				values = self._chunk_view(chunk, i)[lo:hi].tolist()
+				cols.append([decode_value(c["kind"], v, self.categories.get(c["name"])) for v in values])
+
+			for values in zip(*cols):
+				yield dict(zip(self.columns, values))
+
+
+	def close(self):
+		"""Drops the mapping (released once no returned view references it)"""
+		self._mm = None
+		self.chunks = []
+
+
+def decode_value(kind, v, cats=None):
+	"""Converts a stored value back to the value originally logged"""
+
+	if kind == "str":
+		return None if v < 0 else cats[v]
+	if kind == "bool":
+		return None if v < 0 else bool(v)
+	if v != v:		# NaN
+		return None
+	if kind == "int" and v.is_integer():
+		return int(v)
+	return v
+
+
+def export_csv(path, csv_path):
+	"""Converts a columnar chunk file to the DataLogger CSV layout. Returns the number of rows."""
+
+	reader = ColumnReader(path)
+	try:
+		with open(csv_path, "w", newline="") as f:
+			writer = csv.DictWriter(f, fieldnames=reader.columns)
+			writer.writeheader()
+			writer.writerows(reader.rows())
+		return reader.n_rows
+	finally:
+		reader.close()
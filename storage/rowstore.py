@@ -0,0 +1,179 @@
+# storage/rowstore.py
+
+import os
+
+from array import array
+
+from .columnar import ColumnWriter, ColumnReader, value_kind, widen_kind, make_column, decode_value, KINDS
+
+
+# kind -> array typecode
+TYPECODES = {
+	"float": "d",
+	"int": "d",
+	"bool": "b",
+	"str": "i",
+	}
+
+
+class RowStore:
+	"""
+	Compact in-memory store of log rows (drop-in for a list of dicts in DataLogger).
+	- Columns fixed at the first row, one growable typed array per column
+	  (kind set by its first non-None value, int widened to float on the first float)
+	- String columns dictionary-encoded (code -1 = None)
+	- Optional memory ceiling: when reached, rows are spilled to a columnar chunk file
+	Rows come back as dicts through iteration or rows(start).
+	"""
+
+	def __init__(self, memory_limit=None, spill_path=None):
+
+		self.memory_limit = memory_limit
+		self.spill_path = spill_path
+
+		self.schema = None
+		self.columns = []
+		self._arrays = []
+		self._categories = {}		# column -> list of strings (code = index)
+		self._codes = {}			# column -> {str: code}
+
+		self._n_mem = 0				# rows in memory
+		self._n_spilled = 0			# rows in the spill file
+		self._spill = None			# ColumnWriter
+		self._nbytes = 0
+
+
+	def __len__(self):
+		return self._n_spilled + self._n_mem
+
+
+	def __iter__(self):
+		return self.rows(0)
+
+
+	def _init_schema(self, row):
+
+		self.columns = list(row)
+		self.schema = [{"name": name, "kind": None} for name in self.columns]
+		self._arrays = [None] * len(self.columns)		# created once the column kind is known
+		self._row_bytes = 0
+
+
+	def _set_kind(self, i, kind):
+		"""Fixes the kind of column i (filling the rows logged so far with null)"""
+
+		col = self.schema[i] = make_column(self.columns[i], kind)
+		arr = array(TYPECODES[col["kind"]], [KINDS[col["kind"]][1]]) * self._n_mem
+		self._arrays[i] = arr
+		self._row_bytes += arr.itemsize
+
+		if col["kind"] == "str":
+			self._categories[col["name"]] = []
+			self._codes[col["name"]] = {}
+
+
+	def _set_float(self, i):
+		"""Widens int column i to float (same storage, only the decoded type changes)"""
+
+		self.schema[i] = make_column(self.columns[i], "float")
+		return "float"
+
+
+	def append(self, row: dict):
+		"""Appends one row (keys not in the first row are ignored)"""
+
+		if self.schema is None:
+			self._init_schema(row)
+
+		for i, name in enumerate(self.columns):
+			val = row.get(name)
+			arr = self._arrays[i]
+
+			if arr is None:
+				if val is None:
+					continue
+				self._set_kind(i, value_kind(val))
+				arr = self._arrays[i]
+
+			kind = self.schema[i]["kind"]
+			if kind == "int" and widen_kind(kind, val) == "float":
+				kind = self._set_float(i)
+
+			if val is None:
+				arr.append(KINDS[kind][1])
+			elif kind == "str":
+				codes = self._codes[name]
+				code = codes.get(val)
+				if code is None:
+					code = codes[val] = len(codes)
+					self._categories[name].append(val)
+				arr.append(code)
+			elif isinstance(val, str):
+				arr.append(KINDS[kind][1])
+			else:
+				arr.append(val)
+
+		self._n_mem += 1
+		self._nbytes += self._row_bytes
+
+		if self.memory_limit and self.spill_path and self._nbytes >= self.memory_limit:
+			self.spill()
+
+
+	def nbytes(self):
+		"""Approximate memory used by in-memory rows"""
+		return self._nbytes
+
+
+	def _mem_rows(self, start=0):
+		for i in range(start, self._n_mem):
+			yield {
+				c["name"]: None if arr is None else decode_value(c["kind"], arr[i], self._categories.get(c["name"]))
+				for c, arr in zip(self.schema, self._arrays)
+				}
+
+
+	def rows(self, start=0):
+		"""Iterates rows as dicts from row index start (spilled rows first)"""
+
+		if start < self._n_spilled:
+			reader = ColumnReader(self.spill_path)
+			try:
+				yield from reader.rows(start, self._n_spilled)
+			finally:
+				reader.close()
+
+		yield from self._mem_rows(max(0, start - self._n_spilled))
+
+
+	def spill(self):
+		"""Moves every in-memory row to the spill file and frees the arrays"""
+
+		if not self._n_mem:
+			return
+
+		if self._spill is None:
+			for i, arr in enumerate(self._arrays):
+				if arr is None:
+					self._set_kind(i, "float")
+			self._spill = ColumnWriter(self.spill_path, chunk_rows=self._n_mem, schema=self.schema)
+
+		self._spill.extend(self._mem_rows())
+		self._spill.flush()
+
+		print(f"[SPILL] {self._n_mem} rows moved to disk -> {os.path.basename(self.spill_path)}")
+
+		self._n_spilled += self._n_mem
+		self._n_mem = 0
+		self._nbytes = 0
+		self._arrays = [array(a.typecode) for a in self._arrays]
+
+
+	def close(self, remove_spill=True):
+		"""Closes (and by default removes) the spill file"""
+
+		if self._spill is not None:
+			self._spill.close()
+			self._spill = None
+			if remove_spill and os.path.exists(self.spill_path):
+				os.remove(self.spill_path)
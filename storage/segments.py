@@ -0,0 +1,219 @@
+# storage/segments.py
+#
+# Rotating CSV segments:
+#   <stem>.<NNNN>.csv      segment being written (rolled by size or wall-clock time)
+#   <stem>.<NNNN>.csv.gz   closed segment, compressed in the background (.xz with lzma)
+#   <stem>.manifest.json   columns and, per segment: file, rows, time range, raw/stored bytes
+# The manifest is rewritten atomically (tmp + rename) each time a segment is closed or compressed,
+# so readers can pick only the segments covering the time range they need.
+
+import csv
+import gzip
+import json
+import lzma
+import os
+import queue
+import shutil
+import threading
+import time
+
+
+# compression -> (file suffix, opener)
+COMPRESSIONS = {
+	None: ("", open),
+	"gzip": (".gz", gzip.open),
+	"lzma": (".xz", lzma.open),
+	}
+
+
+def manifest_path(save_dir, stem):
+	return os.path.join(save_dir, f"{stem}.manifest.json")
+
+
+class SegmentWriter:
+	"""
+	Writes rows (dicts) to rotating CSV segments.
+	- max_bytes: roll once the current segment reaches that size (None = no size limit)
+	- max_seconds: roll once the current segment is that old (None = no time limit)
+	- compression: "gzip", "lzma" or None, applied to closed segments by a background thread
+	- time_key: column used for the time range of each segment in the manifest
+	"""
+
+	def __init__(self, save_dir, stem, max_bytes=64 * 1024**2, max_seconds=3600, compression="gzip", time_key="Timestamp"):
+
+		if compression not in COMPRESSIONS:
+			raise ValueError(f"Invalid compression '{compression}'. Expected gzip, lzma or None")
+
+		self.save_dir = save_dir
+		self.stem = stem
+		self.max_bytes = max_bytes
+		self.max_seconds = max_seconds
+		self.compression = compression
+		self.time_key = time_key
+
+		self.columns = None
+		self.segments = []		# manifest entries
+		self.n_rows = 0
+
+		self._f = None
+		self._writer = None
+		self._seg = None		# manifest entry of the open segment
+		self._opened = None
+
+		self._lock = threading.Lock()		# manifest (shared with the compressor)
+		self._jobs = queue.Queue()
+		self._th = threading.Thread(target=self._compressor, daemon=True)
+		self._th.start()
+
+
+	@property
+	def manifest(self):
+		return manifest_path(self.save_dir, self.stem)
+
+
+	def _open(self):
+		name = f"{self.stem}.{len(self.segments):04d}.csv"
+		self._f = open(os.path.join(self.save_dir, name), "w", newline="")
+		self._writer = csv.DictWriter(self._f, fieldnames=self.columns, extrasaction="ignore")
+		self._writer.writeheader()
+		self._opened = time.time()
+
+		self._seg = {"file": name, "rows": 0, "t_start": None, "t_end": None, "bytes": 0, "stored_bytes": None, "compression": None}
+		with self._lock:
+			self.segments.append(self._seg)
+
+
+	def append(self, row: dict):
+		self.extend([row])
+
+
+	def extend(self, rows):
+		"""Writes rows to the current segment, rolling it first if it is full or too old"""
+
+		if not rows:
+			return
+
+		if self.columns is None:
+			self.columns = list(rows[0])
+
+		if self._f is not None and self._due():
+			self.roll()
+		if self._f is None:
+			self._open()
+
+		self._writer.writerows(rows)
+
+		seg = self._seg
+		t0, t1 = rows[0].get(self.time_key), rows[-1].get(self.time_key)
+		if seg["t_start"] is None:
+			seg["t_start"] = t0
+		if t1 is not None:
+			seg["t_end"] = t1
+		seg["rows"] += len(rows)
+		self.n_rows += len(rows)
+
+
+	def _due(self):
+		if self.max_seconds is not None and time.time() - self._opened >= self.max_seconds:
+			return True
+		return self.max_bytes is not None and self._f.tell() >= self.max_bytes
+
+
+	def roll(self):
+		"""Closes the current segment and queues it for compression"""
+
+		if self._f is None:
+			return
+
+		self._f.close()
+		seg = self._seg
+		seg["bytes"] = os.path.getsize(os.path.join(self.save_dir, seg["file"]))
+		seg["stored_bytes"] = seg["bytes"]
+		self._f = self._writer = self._seg = None
+
+		self._write_manifest()
+		if self.compression is not None:
+			self._jobs.put(seg)
+
+
+	def _compressor(self):
+		"""Compresses closed segments, then swaps the manifest entry to the compressed file"""
+
+		suffix, opener = COMPRESSIONS[self.compression]
+		while True:
+			seg = self._jobs.get()
+			if seg is None:
+				return
+
+			src = os.path.join(self.save_dir, seg["file"])
+			dst = src + suffix
+			try:
+				with open(src, "rb") as fin, opener(dst, "wb") as fout:
+					shutil.copyfileobj(fin, fout, 1024 * 1024)
+			except OSError as e:
+				print(f"[SEGMENT] Could not compress {seg['file']}: {e}")
+				continue
+
+			with self._lock:
+				seg["file"] += suffix
+				seg["stored_bytes"] = os.path.getsize(dst)
+				seg["compression"] = self.compression
+			self._write_manifest()
+			os.remove(src)
+
+
+	def _write_manifest(self):
+		with self._lock:
+			doc = {
+				"stem": self.stem,
+				"columns": self.columns,
+				"time_key": self.time_key,
+				"segments": [dict(s) for s in self.segments if s is not self._seg],
+				}
+
+			tmp = self.manifest + ".tmp"
+			with open(tmp, "w") as f:
+				json.dump(doc, f, indent=1)
+			os.replace(tmp, self.manifest)
+
+
+	def close(self):
+		"""Closes the last segment and waits for every compression to finish (end of the run)"""
+
+		self.roll()
+		if self._th.is_alive():
+			self._jobs.put(None)
+			self._th.join()
+
+
+def read_manifest(path):
+	with open(path) as f:
+		return json.load(f)
+
+
+def select_segments(manifest, t_start=None, t_end=None):
+	"""Manifest entries whose time range overlaps [t_start, t_end]"""
+
+	selected = []
+	for seg in manifest["segments"]:
+		if t_start is not None and seg["t_end"] is not None and seg["t_end"] < t_start:
+			continue
+		if t_end is not None and seg["t_start"] is not None and seg["t_start"] > t_end:
+			continue
+		selected.append(seg)
+	return selected
+
+
+def iter_segment_rows(path, t_start=None, t_end=None):
+	"""
+	Rows (dicts of CSV strings) of the segments listed in a manifest, oldest first.
+	Only the segments overlapping [t_start, t_end] are opened; rows are not filtered further.
+	"""
+
+	manifest = read_manifest(path)
+	save_dir = os.path.dirname(path)
+
+	for seg in select_segments(manifest, t_start, t_end):
+		opener = COMPRESSIONS[seg["compression"]][1]
+		with opener(os.path.join(save_dir, seg["file"]), "rt", newline="") as f:
+			yield from csv.DictReader(f)
@@ -0,0 +1,163 @@
+# storage/wal.py
+#
+# Write-ahead log of logged rows (.wal):
+#   file header : MAGIC
+#   frame       : uint32 payload_len | uint32 crc32(payload) | payload
+#   payload     : b"S" + JSON column list (once, before the first rows)
+#                 b"R" + JSON list of rows (each row = list of values in column order)
+# Frames are group-committed (write + fsync) every commit_interval seconds or commit_bytes.
+# After a crash, every committed frame is readable; a torn last frame fails its CRC and is ignored.
+
+import csv
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+
+MAGIC = b"LJWAL\x00\x01\x00"
+FRAME_HEADER = struct.Struct("<II")
+
+
+class WalWriter:
+	"""
+	Appends rows (dicts) to a write-ahead log with group commit.
+	- commit_interval: max seconds between a row being appended and being on disk
+	- commit_bytes: commit as soon as that many bytes are pending
+	A background thread commits pending frames when no new rows arrive.
+	An existing log at path (previous run that crashed) is never overwritten: it is renamed
+	<path>.<date-time> first, to be recovered with python -m tools.wal_recover.
+	"""
+
+	def __init__(self, path, commit_interval=0.1, commit_bytes=64 * 1024):
+
+		self.path = path
+		self.commit_interval = commit_interval
+		self.commit_bytes = commit_bytes
+
+		self.columns = None
+		self.n_rows = 0
+		self.commits = 0
+
+		if os.path.exists(path):
+			kept = f"{path}.{time.strftime('%Y%m%d-%H%M%S')}"
+			os.replace(path, kept)
+			print(f"[WAL] Previous write-ahead log kept -> {kept} (recover with python -m tools.wal_recover)")
+
+		self._f = open(path, "xb")
+		self._f.write(MAGIC)
+		self._pending = bytearray()
+		self._first_pending = None		# time of the oldest uncommitted frame
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+
+		self._th = threading.Thread(target=self._committer, daemon=True)
+		self._th.start()
+
+
+	def _frame(self, payload):
+		self._pending += FRAME_HEADER.pack(len(payload), zlib.crc32(payload))
+		self._pending += payload
+		if self._first_pending is None:
+			self._first_pending = time.monotonic()
+
+
+	def append(self, rows):
+		"""Appends rows (list of dicts); commits if the size budget is reached"""
+
+		if not rows:
+			return
+
+		with self._lock:
+			if self.columns is None:
+				self.columns = list(rows[0])
+				self._frame(b"S" + json.dumps(self.columns).encode())
+
+			cols = self.columns
+			values = [[row.get(c) for c in cols] for row in rows]
+			self._frame(b"R" + json.dumps(values, separators=(",", ":")).encode())
+			self.n_rows += len(rows)
+
+			if len(self._pending) >= self.commit_bytes:
+				self._commit()
+
+
+	def _commit(self):
+		# Called with self._lock held
+		if not self._pending:
+			return
+		self._f.write(self._pending)
+		self._f.flush()
+		os.fsync(self._f.fileno())
+		self._pending = bytearray()
+		self._first_pending = None
+		self.commits += 1
+
+
+	def commit(self):
+		with self._lock:
+			self._commit()
+
+
+	def _committer(self):
+		"""Commits pending frames at most commit_interval after they were appended"""
+
+		while not self._stop.wait(self.commit_interval / 2):
+			with self._lock:
+				if self._first_pending is not None and time.monotonic() - self._first_pending >= self.commit_interval:
+					self._commit()
+
+
+	def close(self):
+		self._stop.set()
+		self._th.join()
+		with self._lock:
+			self._commit()
+			self._f.close()
+
+
+def read_wal(path):
+	"""
+	Reads a write-ahead log. Returns (columns, rows) with rows as dicts.
+	Stops at the first incomplete or corrupted frame (crash while writing).
+	"""
+
+	columns = None
+	rows = []
+
+	with open(path, "rb") as f:
+		if f.read(len(MAGIC)) != MAGIC:
+			raise ValueError(f"{path} is not a write-ahead log file")
+
+		while True:
+			head = f.read(FRAME_HEADER.size)
+			if len(head) < FRAME_HEADER.size:
+				break
+			length, crc = FRAME_HEADER.unpack(head)
+			payload = f.read(length)
+			if len(payload) < length or zlib.crc32(payload) != crc:
+				break
+
+			kind, body = payload[:1], payload[1:]
+			if kind == b"S":
+				columns = json.loads(body)
+			elif kind == b"R" and columns is not None:
+				rows.extend(dict(zip(columns, values)) for values in json.loads(body))
+
+	return columns, rows
+
+
+def recover_csv(path, csv_path):
+	"""Rebuilds the DataLogger CSV from a write-ahead log. Returns the number of rows."""
+
+	columns, rows = read_wal(path)
+	if columns is None:
+		return 0
+
+	with open(csv_path, "w", newline="") as f:
+		writer = csv.DictWriter(f, fieldnames=columns)
+		writer.writeheader()
+		writer.writerows(rows)
+	return len(rows)
@@ -0,0 +1,51 @@
+# tests/test_storage.py
+#
+# Usage: python -m unittest discover tests
+
+import os
+import tempfile
+import unittest
+
+from storage.columnar import ColumnWriter, ColumnReader
+from storage.rowstore import RowStore
+
+
+MIXED = [0, 2.5, 3.7, 1]		# int first, then floats, in the same column
+
+
+class MixedIntFloatColumn(unittest.TestCase):
+	"""A column whose first value is an int must keep the floats logged after it"""
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(self.tmp.cleanup)
+
+	def rows(self):
+		return [{"Timestamp": i * 0.1, "LC0": v} for i, v in enumerate(MIXED)]
+
+	def test_rowstore(self):
+		store = RowStore()
+		for row in self.rows():
+			store.append(row)
+		self.assertEqual([r["LC0"] for r in store], MIXED)
+
+	def test_rowstore_spilled(self):
+		store = RowStore(memory_limit=1, spill_path=os.path.join(self.tmp.name, "spill.ljcol"))
+		for row in self.rows():
+			store.append(row)
+		self.assertEqual([r["LC0"] for r in store], MIXED)
+		store.close()
+
+	def test_column_writer(self):
+		path = os.path.join(self.tmp.name, "run.ljcol")
+		writer = ColumnWriter(path, chunk_rows=2)
+		writer.extend(self.rows())
+		writer.close()
+
+		reader = ColumnReader(path)
+		self.assertEqual([r["LC0"] for r in reader.rows()], MIXED)
+		reader.close()
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -3,70 +3,87 @@
 import time
 import traceback
 
-def loop_acquisition(lj, controller, data_q, plot_q, running, start_t, interval):
+from controllers.base import TickClock
+from .plan import AcquisitionPlan
+
+def loop_acquisition(lj, controller, data_q, plot_q, running, start_t, interval, plan=None, instr=None):
 	"""
 	Acquisition thread. Reponsible of:
-	- Reading and storing inputs dict
-	- Applling outputs dict to hardware
+	- Reading and storing inputs dict (batched in one Feedback transaction,
+	  or latest stream sample for channels in the running stream)
+	- Applling outputs dict to hardware (batched in one Feedback transaction)
 	- Pushing PINs state in a data_q
 	- Puhsing reduces PINs state in a plot_q
+	Inputs/outputs are compiled once in an AcquisitionPlan (built here if not given).
+	The next tick follows the controller scheduling hints: sample_period() for the
+	current phase (default: interval) and wake_deadline() (e.g. end of a rest phase).
+	instr (optional threads.instrumentation.LoopInstrumentation) records stage durations
+	(read, compute, write, publish), the actual period and deadline overruns.
+	The controller runs on a TickClock read just before compute(): TimeABS is that time,
+	so a recorded run replays with the very times the controller saw (sim/replay.py).
 	"""
 	
-	inputs_list = controller.required_inputs
+	if plan is None:
+		plan = AcquisitionPlan(lj, controller)
+	
+	clock = TickClock()
+	if hasattr(controller, "set_clock"):
+		controller.set_clock(clock)
+	
 	next_sleep = time.time()
 	
 	while running.is_set():
 		try:
-			timestamp = time.time() - start_t
+			if instr is not None:
+				instr.tick_start()
 			
-			inputs = {}
+			timestamp = time.time() - start_t
 			
 			# Update inputs
-			for ipt in inputs_list:
-				if ipt.startswith("AIN"):
-					val = lj.read_ain(ipt)
-				elif ipt.startswith("LC"):
-					val = lj.read_loadcell_force(ipt)
-				elif ipt.startswith("FIO"):
-					val = lj.read_dio(ipt)
-				else:
-					print(f"[WARN] Unknown input type: {ipt}")
-				inputs[ipt] = None if val is None else val
+			inputs = plan.read()
+			if instr is not None:
+				instr.mark("read")
 			
-			# Updates outputs via controller
+			# Updates outputs via controller (controller time frozen for the tick)
+			time_abs = clock.tick()
 			outputs = controller.compute(inputs)
+			if instr is not None:
+				instr.mark("compute")
 			
 			# Apply outputs to hardware
-			for key, val in outputs.items():
-				if key.startswith("FIO"):
-					lj.write_dio(key, val)
-				elif key.startswith("DAC"):
-					lj.write_dac(key, val)
-			
-			# Pushes data in data_q
-			data = {
-				"Timestamp": timestamp,
-				"TimeABS": time.time(),
-				**inputs,
-				**outputs
-				}
+			plan.write(outputs)
+			if instr is not None:
+				instr.mark("write")
 			
+			# Pushes the same row in data_q and plot_q (read-only for consumers)
+			# plot_q is None when data_q is a SharedRing read by every consumer
+			# The plan row is refilled next tick: copied unless data_q copies the values on put
+			data = plan.fill_row(timestamp, time_abs, inputs, outputs)
+			if not getattr(data_q, "copies_rows", False):
+				data = data.copy()
 			data_q.put(data)
-			
-			# Pushes reduced_data in plot_q
-			reduced_data = {
-				"Timestamp": data["Timestamp"],
-				**inputs
-				}
-			plot_q.put(reduced_data)
+			if plot_q is not None:
+				plot_q.put(data)
 			
 			# Pause (theorically more consistent than time.sleep(interval)
-			next_sleep += interval
-			sleep_time = max(0, next_sleep - time.time())
-			time.sleep(sleep_time)
+			next_sleep += controller.sample_period() or interval
+			
+			deadline = controller.wake_deadline()
+			now = time.time()
+			if deadline is not None and now < deadline < next_sleep:
+				next_sleep = deadline
+			sleep_time = next_sleep - now
+			
+			if instr is not None:
+				instr.mark("publish")
+				instr.tick_end(sleep_time < 0)
+			
+			time.sleep(max(0, sleep_time))
 
 
 		except Exception as e:
 			print(f"Error in acquisition thread: {e}")
 			traceback.print_exc()
+			lj.dump_trace()
 			time.sleep(0.1)
+
@@ -0,0 +1,245 @@
+# threads/dashboard.py
+
+import json
+import time
+import threading
+import traceback
+
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from queue import Empty
+from plotly.offline import get_plotlyjs
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Bench dashboard</title>
+<script src="/plotly.min.js"></script>
+<style>
+	body { font-family: sans-serif; margin: 1em; }
+	#status span { margin-right: 2em; }
+	.plot { height: 260px; }
+</style>
+</head>
+<body>
+<div id="status"><span id="phase">Phase: --</span><span id="cycle">Cycle: --</span><span id="conn">connecting...</span></div>
+<div id="plots"></div>
+<script>
+const MAXPTS = %(maxlen)d;
+let channels = [];
+
+function setStatus(msg) {
+	if (msg.phase !== undefined) document.getElementById("phase").textContent = "Phase: " + msg.phase;
+	if (msg.cycle !== undefined) document.getElementById("cycle").textContent = "Cycle: " + msg.cycle;
+}
+
+const es = new EventSource("/events");
+
+es.addEventListener("init", (e) => {
+	const msg = JSON.parse(e.data);
+	channels = msg.channels;
+	const root = document.getElementById("plots");
+	root.innerHTML = "";
+	channels.forEach((ch, i) => {
+		const div = document.createElement("div");
+		div.id = "plot_" + i;
+		div.className = "plot";
+		root.appendChild(div);
+		Plotly.newPlot(div, [{x: msg.t, y: msg.y[ch], mode: "lines", name: ch}],
+			{title: {text: ch}, margin: {t: 30, b: 30}, xaxis: {title: {text: "Time [s]"}}});
+	});
+	setStatus(msg);
+	document.getElementById("conn").textContent = "live";
+});
+
+es.onmessage = (e) => {
+	const msg = JSON.parse(e.data);
+	setStatus(msg);
+	if (!msg.t.length) return;
+	channels.forEach((ch, i) => {
+		Plotly.extendTraces("plot_" + i, {x: [msg.t], y: [msg.y[ch]]}, [0], MAXPTS);
+	});
+};
+
+es.onerror = () => { document.getElementById("conn").textContent = "disconnected"; };
+</script>
+</body>
+</html>
+"""
+
+
+class DashboardState:
+	"""
+	Shared state between the feeding loop and the SSE client threads.
+	- recent: last maxlen points (sent to new clients)
+	- batches: last increments with a sequence number (each client keeps its own cursor)
+	"""
+
+	def __init__(self, channels, running, maxlen=5000, max_batches=200):
+
+		self.channels = channels
+		self.running = running
+		self.recent_t = deque(maxlen=maxlen)
+		self.recent_y = {ch: deque(maxlen=maxlen) for ch in channels}
+		self.batches = deque(maxlen=max_batches)
+		self.status = {}
+		self.seq = 0
+		self.cond = threading.Condition()
+
+
+	def publish(self, rows, status):
+		"""Publishes new rows and controller status to every connected client"""
+
+		t = [d["Timestamp"] for d in rows]
+		y = {ch: [_num(d.get(ch)) for d in rows] for ch in self.channels}
+
+		if not t and status == self.status:
+			return
+
+		payload = json.dumps({"t": t, "y": y, **status})
+
+		with self.cond:
+			self.recent_t.extend(t)
+			for ch in self.channels:
+				self.recent_y[ch].extend(y[ch])
+			self.status = status
+			self.seq += 1
+			self.batches.append((self.seq, payload))
+			self.cond.notify_all()
+
+
+	def snapshot(self):
+		"""Returns (seq, init payload) with the recent window"""
+
+		with self.cond:
+			payload = json.dumps({
+				"channels": self.channels,
+				"t": list(self.recent_t),
+				"y": {ch: list(v) for ch, v in self.recent_y.items()},
+				**self.status
+				})
+			return self.seq, payload
+
+
+	def wait_since(self, seq, timeout=1.0):
+		"""Waits for batches newer than seq. Returns (last seq, [payloads])"""
+
+		with self.cond:
+			if self.seq == seq:
+				self.cond.wait(timeout)
+			return self.seq, [p for s, p in self.batches if s > seq]
+
+
+def _num(v):
+	return None if v is None else float(v)
+
+
+def _make_handler(state, maxlen):
+
+	page = (PAGE % {"maxlen": maxlen}).encode()
+	plotly_js = get_plotlyjs().encode()
+
+	class DashboardHandler(BaseHTTPRequestHandler):
+
+		def log_message(self, format, *args):
+			pass
+
+		def _send(self, body, content_type):
+			self.send_response(200)
+			self.send_header("Content-Type", content_type)
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def do_GET(self):
+			if self.path == "/":
+				self._send(page, "text/html; charset=utf-8")
+			elif self.path == "/plotly.min.js":
+				self._send(plotly_js, "application/javascript")
+			elif self.path == "/events":
+				self._events()
+			else:
+				self.send_error(404)
+
+		def _events(self):
+			"""Server-Sent Events: init snapshot, then only new points"""
+
+			self.send_response(200)
+			self.send_header("Content-Type", "text/event-stream")
+			self.send_header("Cache-Control", "no-cache")
+			self.end_headers()
+
+			try:
+				seq, payload = state.snapshot()
+				self.wfile.write(f"event: init\ndata: {payload}\n\n".encode())
+				self.wfile.flush()
+
+				while state.running.is_set():
+					seq, payloads = state.wait_since(seq)
+					if payloads:
+						self.wfile.write("".join(f"data: {p}\n\n" for p in payloads).encode())
+					else:
+						self.wfile.write(b": keepalive\n\n")
+					self.wfile.flush()
+
+			except (BrokenPipeError, ConnectionResetError):
+				pass
+
+	return DashboardHandler
+
+
+def _status_text(controller, attr):
+	"""Status value as shown on the page ("brake: 12 | trim: 3" for a ControllerGroup)"""
+
+	machines = getattr(controller, "controllers", None)
+	if machines:
+		return " | ".join(f"{name}: {getattr(ctrl, attr, None)}" for name, ctrl in machines.items())
+	return getattr(controller, attr, None)
+
+
+def loop_dashboard(plot_q, controller, running, host="127.0.0.1", port=8050, interval=0.25, channels=None, maxlen=5000):
+	"""
+	Thread serving a live dashboard page on http://host:port/.
+	Feeds from plot_q (instead of loop_plotting) and pushes only new points over SSE.
+	- channels: plotted inputs (default: every controller required input)
+	- Shows controller phase and cycle count (per bench for a ControllerGroup)
+	"""
+
+	channels = channels or list(controller.required_inputs)
+	state = DashboardState(channels, running, maxlen)
+
+	server = ThreadingHTTPServer((host, port), _make_handler(state, maxlen))
+	server.daemon_threads = True
+	srv_th = threading.Thread(target=server.serve_forever, daemon=True)
+	srv_th.start()
+	print(f"[DASHBOARD] Serving on http://{host}:{port}/")
+
+	try:
+		while running.is_set() or not plot_q.empty():
+
+			# Getting all data in the queue
+			rows = []
+			while True:
+				try:
+					rows.append(plot_q.get(block = False))
+				except Empty:
+					break
+
+			status = {
+				"phase": _status_text(controller, "phase"),
+				"cycle": _status_text(controller, "cycle_counter")
+				}
+			state.publish(rows, status)
+
+			time.sleep(interval)
+
+	except Exception as e:
+		print(f"Error in dashboard thread: {e}")
+		traceback.print_exc()
+
+	finally:
+		server.shutdown()
+		server.server_close()
+		print("Dashboard thread closed.")
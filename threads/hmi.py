@@ -1,34 +1,172 @@
 # threads/hmi.py
 
+import shutil
+import sys
 import time
-import os
-
-def loop_hmi_brake(controller, running, refresh=1.0):
-	"""Threads for HMI"""
-	
-	while running.is_set() and controller.phase != "end_of_test":
-		os.system("cls" if os.name == "nt" else "clear")
-		print("=== Bake Bench MONITOR ===")
-		print(f"Cycle		: {controller.cycle_counter}")
-		print(f"Phase		: {controller.phase}")
-		print(f"Force (LC0)	: {controller.last_force:.2f}N" if controller.last_force else "Force (LC0)	: --")
-		print(f"Cycle speed	: {controller.cycle_speed:.2f} cpm" if controller.cycle_speed else "Cycle speed	: --")
-		print(f"Push AVG	: {controller.avg_push_duration:.2f}s" if controller.avg_push_duration else "Push AVG	: --")
-		print("------------------------------------------")
-		print(f"ETA		: {controller.eta_s/60:.1f}min" if controller.eta_s else "ETA		: --")
-		
-		time.sleep(refresh)
-
-def loop_hmi_trim(controller, running, refresh=1.0):
-	"""Threads for HMI"""
-	
-	while running.is_set() and controller.phase != "end_of_test":
-		os.system("cls" if os.name == "nt" else "clear")
-		print("=== Bake Bench MONITOR ===")
-		print(f"Cycle		: {controller.cycle_counter}")
-		print(f"Phase		: {controller.phase}")
-		print(f"Cycle speed	: {controller.cycle_speed:.2f} cpm" if controller.cycle_speed else "Cycle speed	: --")
-		print("------------------------------------------")
-		print(f"ETA		: {controller.eta_s/60:.1f}min" if controller.eta_s else "ETA		: --")
-		
-		time.sleep(refresh)
+
+from operator import attrgetter
+
+try:
+	import colorama
+	colorama.just_fix_windows_console()		# ANSI sequences on Windows consoles
+except ImportError:
+	colorama = None
+
+
+class TerminalRenderer:
+	"""
+	Flicker-free terminal renderer using ANSI cursor addressing.
+	The screen is cleared and fully painted, then only the values that changed are redrawn.
+	A full repaint happens every repaint_interval seconds and on a terminal size change
+	(other threads print to the same terminal and scroll or overwrite the layout).
+	rows: list of labels (None for a separator line)
+	"""
+
+	def __init__(self, title, rows, label_width=16, stream=sys.stdout, repaint_interval=5.0):
+		self.title = title
+		self.rows = rows
+		self.label_width = label_width
+		self.stream = stream
+		self.repaint_interval = repaint_interval
+		self.shown = [None] * len(rows)
+		self.started = False
+		self.painted = None		# time of the last full paint
+		self.size = None
+
+	def _line(self, i):
+		return i + 2		# 1-based terminal line, title on line 1
+
+	def start(self):
+		out = ["\x1b[2J\x1b[H\x1b[?25l", f"=== {self.title} ===\n"]
+		for label in self.rows:
+			if label is None:
+				out.append("-" * 42 + "\n")
+			else:
+				out.append(f"{label:<{self.label_width}}: \n")
+		self.stream.write("".join(out))
+		self.stream.flush()
+		self.started = True
+		self.painted = time.time()
+		self.size = shutil.get_terminal_size()
+		self.shown = [None] * len(self.rows)		# every value redrawn by update
+
+	def _needs_repaint(self):
+		if not self.started:
+			return True
+		return time.time() - self.painted >= self.repaint_interval or shutil.get_terminal_size() != self.size
+
+	def update(self, values):
+		"""values: list of strings aligned with rows (ignored for separators)"""
+
+		if self._needs_repaint():
+			self.start()
+
+		col = self.label_width + 3
+		out = []
+		for i, (label, val) in enumerate(zip(self.rows, values)):
+			if label is None or val == self.shown[i]:
+				continue
+			out.append(f"\x1b[{self._line(i)};{col}H{val}\x1b[K")
+			self.shown[i] = val
+
+		if out:
+			out.append(f"\x1b[{self._line(len(self.rows))};1H")
+			self.stream.write("".join(out))
+			self.stream.flush()
+
+	def close(self):
+		if self.started:
+			self.stream.write(f"\x1b[{self._line(len(self.rows))};1H\x1b[?25h\n")
+			self.stream.flush()
+
+
+def _getter(attr):
+	"""Attribute reader, dotted paths allowed (e.g. "brake.phase" on a ControllerGroup)"""
+	get = attrgetter(attr)
+
+	def read(obj):
+		try:
+			return get(obj)
+		except AttributeError:
+			return None
+	return read
+
+
+def _fmt(val, fmt):
+	if val is None:
+		return "--"
+	if callable(fmt):
+		return fmt(val)
+	return fmt.format(val)
+
+
+class HmiView:
+	"""
+	HMI content: rows (labels) and current values (strings).
+	Rows come from controller.hmi_fields [(label, attribute, format) or None for a separator],
+	followed by acquisition loop timing (instr.snapshot()) and data_q depth.
+	"""
+
+	def __init__(self, controller, instr=None, data_q=None, title=None):
+
+		self.controller = controller
+		self.instr = instr
+		self.data_q = data_q
+		self.title = title or f"{type(controller).__name__} MONITOR"
+
+		self.fields = list(getattr(controller, "hmi_fields", [("Phase", "phase", "{}")]))
+		self.getters = [_getter(f[1]) if f else None for f in self.fields]
+		self.rows = [f[0] if f else None for f in self.fields]
+
+		if instr is not None:
+			self.rows += [None, "Loop rate", "Period p99", "Busy p99", "Overruns"]
+		if data_q is not None:
+			self.rows += ["Queue depth"]
+
+		self.label_width = max([16, *(len(r) for r in self.rows if r)])
+
+
+	def values(self):
+		"""Current values, aligned with rows"""
+
+		controller = self.controller
+		values = [_fmt(get(controller), f[2]) if f else "" for f, get in zip(self.fields, self.getters)]
+
+		if self.instr is not None:
+			snap = self.instr.snapshot()
+			values += [
+				"",
+				f"{snap['rate_hz']:.1f} Hz",
+				_fmt(snap["period"]["p99"], lambda v: f"{v*1e3:.1f} ms"),
+				_fmt(snap["busy"]["p99"], lambda v: f"{v*1e3:.1f} ms"),
+				f"{snap['missed']} / {snap['ticks']}"
+				]
+		if self.data_q is not None:
+			stats = self.data_q.stats()
+			values += [f"{stats['depth']} (max {stats['max_depth']}, dropped {stats['dropped']})"]
+
+		return values
+
+
+def loop_hmi(controller, running, refresh=0.1, instr=None, data_q=None, title=None):
+	"""Threads for HMI (see HmiView for the displayed rows)"""
+
+	view = HmiView(controller, instr, data_q, title)
+	renderer = TerminalRenderer(view.title, view.rows, view.label_width)
+
+	try:
+		while running.is_set() and controller.phase != "end_of_test":
+			renderer.update(view.values())
+			time.sleep(refresh)
+
+	finally:
+		renderer.close()
+
+
+def loop_hmi_brake(controller, running, refresh=1.0, instr=None, data_q=None):
+	"""Threads for HMI (brake bench)"""
+	loop_hmi(controller, running, refresh, instr, data_q, "Brake Bench MONITOR")
+
+def loop_hmi_trim(controller, running, refresh=1.0, instr=None, data_q=None):
+	"""Threads for HMI (trim bench)"""
+	loop_hmi(controller, running, refresh, instr, data_q, "Trim Bench MONITOR")
@@ -0,0 +1,134 @@
+# threads/instrumentation.py
+
+import json
+import time
+
+from bisect import bisect_left
+
+
+# Bucket upper edges from 10 us to 10 s (seconds), 10 per decade
+DEFAULT_EDGES = [m * 10.0**e for e in range(-5, 1) for m in (1, 1.2, 1.5, 2, 2.5, 3, 4, 5, 6, 8)] + [10.0]
+
+
+class Histogram:
+	"""Fixed-bucket histogram (constant time record, no sample kept)"""
+
+	def __init__(self, edges=DEFAULT_EDGES):
+		self.edges = list(edges)
+		self.counts = [0] * (len(self.edges) + 1)		# last bucket: above the last edge
+		self.n = 0
+		self.total = 0.0
+		self.max = 0.0
+
+	def record(self, x):
+		self.counts[bisect_left(self.edges, x)] += 1
+		self.n += 1
+		self.total += x
+		if x > self.max:
+			self.max = x
+
+	def percentile(self, p):
+		"""Upper edge of the bucket containing the p quantile (bounded by the max seen)"""
+
+		if self.n == 0:
+			return None
+		rank = p * self.n
+		acc = 0
+		for i, c in enumerate(self.counts):
+			acc += c
+			if acc >= rank and c:
+				return min(self.edges[i], self.max) if i < len(self.edges) else self.max
+		return self.max
+
+	def snapshot(self):
+		return {
+			"n": self.n,
+			"mean": self.total / self.n if self.n else None,
+			"p50": self.percentile(0.50),
+			"p99": self.percentile(0.99),
+			"max": self.max,
+			"counts": list(self.counts),
+			}
+
+
+class LoopInstrumentation:
+	"""
+	Timing instrumentation of a periodic loop (acquisition thread).
+	Per tick: tick_start(), mark(stage) after each stage, tick_end(overrun).
+	Records stage durations and the actual period in histograms, counts deadline overruns.
+	snapshot() can be read from any thread (HMI, logger, final report).
+	"""
+
+	def __init__(self, interval, stages=("read", "compute", "write", "publish")):
+		self.interval = interval
+		self.stages = {name: Histogram() for name in stages}
+		self.period = Histogram()
+		self.busy = Histogram()
+
+		self.ticks = 0
+		self.missed = 0
+		self.rate_hz = 0.0
+
+		self._t_start = None
+		self._t = None
+		self._t_last_start = None
+
+
+	def tick_start(self):
+		now = time.perf_counter()
+		if self._t_last_start is not None:
+			period = now - self._t_last_start
+			self.period.record(period)
+			if period > 0:
+				rate = 1.0 / period
+				self.rate_hz = rate if not self.rate_hz else 0.9 * self.rate_hz + 0.1 * rate
+		self._t_last_start = now
+		self._t_start = now
+		self._t = now
+
+
+	def mark(self, stage):
+		now = time.perf_counter()
+		self.stages[stage].record(now - self._t)
+		self._t = now
+
+
+	def tick_end(self, overrun=False):
+		self.busy.record(time.perf_counter() - self._t_start)
+		self.ticks += 1
+		if overrun:
+			self.missed += 1
+
+
+	def snapshot(self):
+		return {
+			"interval": self.interval,
+			"ticks": self.ticks,
+			"missed": self.missed,
+			"rate_hz": self.rate_hz,
+			"period": self.period.snapshot(),
+			"busy": self.busy.snapshot(),
+			"stages": {name: h.snapshot() for name, h in self.stages.items()},
+			"edges": self.period.edges,
+			}
+
+
+	def report(self):
+		"""Human readable summary (ms)"""
+
+		def ms(v):
+			return "--" if v is None else f"{v*1e3:.2f}"
+
+		snap = self.snapshot()
+		lines = [
+			f"[TIMING] {snap['ticks']} ticks, {snap['missed']} overruns, {snap['rate_hz']:.1f} Hz (target {1/self.interval:.1f} Hz)",
+			f"[TIMING] {'':<8} {'mean':>8} {'p50':>8} {'p99':>8} {'max':>8}  [ms]",
+			]
+		for name, h in [("period", snap["period"]), ("busy", snap["busy"]), *snap["stages"].items()]:
+			lines.append(f"[TIMING] {name:<8} {ms(h['mean']):>8} {ms(h['p50']):>8} {ms(h['p99']):>8} {ms(h['max']):>8}")
+		return "\n".join(lines)
+
+
+	def save_json(self, path):
+		with open(path, "w") as f:
+			json.dump(self.snapshot(), f, indent=1)
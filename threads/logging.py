@@ -1,30 +1,31 @@
 # threads/logging.py
 
+import os
 import traceback
 import time
-from queue import Empty
 
-def loop_logging(dl, data_q, running, save_event):
-	"""Threads to log data from data_q"""
+def loop_logging(dl, data_q, running, save_event, max_batch=5000, instr=None):
+	"""
+	Threads to log data from data_q (a threads.queues.SampleQueue).
+	Drains every available row in one batch and hands it to dl.log_batch.
+	instr (optional LoopInstrumentation): final timing report printed and saved
+	next to the log as <save_file stem>_timing.json.
+	"""
 	
 	try:
 		while running.is_set() or not data_q.empty():
 			
-			try:
-				
-				# Get data from data_q
-				data = data_q.get(block = True, timeout = 0.1)
-				
-				# Reccord parsed data
-				dl.log(data)
+			# Get all available data from data_q
+			batch = data_q.get_batch(max_items = max_batch, timeout = 0.1)
 			
-			except Empty:
-				pass
-		
-		# Manual seve event
-		if save_event.is_set():
-			dl.save_csv()
-			pass
+			# Reccord parsed data
+			if batch:
+				dl.log_batch(batch)
+			
+			# Manual seve event
+			if save_event.is_set():
+				dl.save_csv(final=False)
+				save_event.clear()
 	
 	except Exception as e:
 		print(f"Error in logging thread: {e}")
@@ -34,3 +35,10 @@ def loop_logging(dl, data_q, running, save_event):
 	finally:
 		print("Final save before exit...")
 		dl.save_csv()
+		
+		stats = data_q.stats()
+		print(f"[QUEUE] data_q max depth {stats['max_depth']}, {stats['dropped']} rows dropped ({data_q.policy}).")
+		
+		if instr is not None:
+			print(instr.report())
+			instr.save_json(os.path.join(dl.save_dir, os.path.splitext(dl.save_file)[0] + "_timing.json"))
@@ -0,0 +1,157 @@
+# threads/multi.py
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from LabJackU6 import LabJackU6Controller
+from .plan import AcquisitionPlan
+
+
+def split_pin(name, default):
+	"""'dev:pin' -> ('dev', 'pin'). Unprefixed names belong to the default device."""
+
+	dev, sep, pin = name.partition(":")
+	return (dev, pin) if sep else (default, name)
+
+
+class DeviceGroup:
+	"""
+	Several LabJackU6Controller addressed by name, e.g. {"A": lj_a, "B": lj_b}.
+	The first device is the default one for unprefixed pin names.
+	"""
+
+	def __init__(self, devices):
+
+		if not devices:
+			raise ValueError("DeviceGroup needs at least one device.")
+
+		self.devices = dict(devices)
+		self.default = next(iter(self.devices))
+
+
+	@classmethod
+	def open(cls, serials, log_dir="logs/", **kwargs):
+		"""Opens one U6 per serial number: serials = {name: serial}"""
+		return cls({
+			name: LabJackU6Controller(log_dir, f"LabJackU6_{name}.log", serial=serial, **kwargs)
+			for name, serial in serials.items()
+			})
+
+
+	def __getitem__(self, name):
+		return self.devices[name]
+
+
+	def dump_trace(self):
+		for lj in self.devices.values():
+			lj.dump_trace()
+
+
+	def close(self, dio_val=0, dac_val=0):
+		for lj in self.devices.values():
+			lj.close(dio_val, dac_val)
+
+
+class MultiDevicePlan:
+	"""
+	AcquisitionPlan over a DeviceGroup, for controllers addressing pins as "dev:pin".
+	- One sub-plan and one I/O worker per device: reads (then writes) of every device
+	  run concurrently, so USB round trips overlap instead of adding up
+	- Each device sample is stamped on the host clock at the midpoint of its read
+	  ("<dev>:Timestamp" columns, same origin as Timestamp)
+	Same interface as AcquisitionPlan (read, write, fill_row, columns).
+	Raises ValueError at compile time for unknown devices or pins.
+	"""
+
+	def __init__(self, group, controller, start_t=0.0):
+
+		self.group = group
+		self.controller = controller
+		self.start_t = start_t
+
+		self.input_names = list(controller.required_inputs)
+		self.inputs = {name: None for name in self.input_names}
+
+		# --- Split pins by device: (qualified name, local pin) --- #
+		self._in_map = {dev: [] for dev in group.devices}
+		self._out_map = {dev: [] for dev in group.devices}
+
+		for names, mapping, role in ((self.input_names, self._in_map, "input"), (controller.states, self._out_map, "output")):
+			for name in names:
+				dev, pin = split_pin(name, group.default)
+				if dev not in mapping:
+					raise ValueError(f"{name} ({role}): unknown device '{dev}'.")
+				mapping[dev].append((name, pin))
+
+		self.plans = {}
+		for dev, lj in group.devices.items():
+			if self._in_map[dev] or self._out_map[dev]:
+				self.plans[dev] = AcquisitionPlan(
+					lj,
+					controller,
+					inputs = [pin for name, pin in self._in_map[dev]],
+					outputs = [pin for name, pin in self._out_map[dev]]
+					)
+
+		self.sample_t = {dev: None for dev in self.plans}
+		self._pool = ThreadPoolExecutor(max_workers=len(self.plans), thread_name_prefix="u6-io")
+
+		# --- Row layout --- #
+		self.output_names = list(controller.states) + list(getattr(controller, "report_fields", []))
+		self.time_names = [f"{dev}:Timestamp" for dev in self.plans]
+		self.columns = ["Timestamp", "TimeABS", *self.time_names, *self.input_names, *self.output_names]
+		self.row = dict.fromkeys(self.columns)
+
+
+	def _read_device(self, dev):
+		t0 = time.time()
+		values = self.plans[dev].read()
+		t1 = time.time()
+		self.sample_t[dev] = 0.5 * (t0 + t1) - self.start_t
+		return dev, values
+
+
+	def _write_device(self, item):
+		dev, outputs = item
+		self.plans[dev].write(outputs)
+
+
+	def read(self):
+		"""Reads every device concurrently and returns the (reused) inputs dict"""
+
+		inputs = self.inputs
+		for dev, values in self._pool.map(self._read_device, self.plans):
+			for name, pin in self._in_map[dev]:
+				inputs[name] = values[pin]
+		return inputs
+
+
+	def write(self, outputs):
+		"""Applies the controller outputs, one Feedback transaction per device, concurrently"""
+
+		per_device = [
+			(dev, {pin: outputs.get(name) for name, pin in self._out_map[dev]})
+			for dev in self.plans if self._out_map[dev]
+			]
+		for _ in self._pool.map(self._write_device, per_device):
+			pass
+
+
+	def fill_row(self, timestamp, time_abs, inputs, outputs):
+		"""Fills the preallocated row dict (column order) and returns it (refilled next tick)"""
+
+		row = self.row
+		row["Timestamp"] = timestamp
+		row["TimeABS"] = time_abs
+		for dev, name in zip(self.plans, self.time_names):
+			row[name] = self.sample_t[dev]
+		for name in self.input_names:
+			row[name] = inputs[name]
+		for name in self.output_names:
+			row[name] = outputs.get(name)
+		return row
+
+
+	def close(self):
+		self._pool.shutdown(wait=True)
@@ -0,0 +1,184 @@
+# threads/plan.py
+
+import u6
+
+from LabJackU6 import dac_command
+
+
+class AcquisitionPlan:
+	"""
+	Controller inputs/outputs compiled once at startup.
+	- Inputs: one reusable Feedback transaction + bound stream readers, with a Feedback
+	  fallback transaction used for a tick when the stream is down or stale
+	  (only the latest stream sample per tick is used, the stream blocks are not logged)
+	- Outputs: one prebuilt write transaction (one command per pin), patched in place
+	  when a pin value changes
+	- Row: fixed column order in one preallocated dict, refilled every tick
+	Raises ValueError at compile time for unsupported or unknown pins.
+	inputs/outputs: pin names handled by this plan (default: every controller input/state),
+	used to split a controller over several devices (see threads.multi).
+	"""
+
+	def __init__(self, lj, controller, inputs=None, outputs=None):
+
+		self.lj = lj
+		self.controller = controller
+
+		self.input_names = list(controller.required_inputs if inputs is None else inputs)
+		self.inputs = {name: None for name in self.input_names}
+
+		# --- Inputs --- #
+		streamed = {c[0] for c in lj.stream_channels} if lj.streaming else set()
+
+		self.read_tx = lj.transaction()
+		self.fallback_tx = lj.transaction()		# streamed inputs, read by Feedback
+		self.stream_readers = []		# (name, callable)
+		self.stream_fallbacks = 0		# ticks read through fallback_tx
+
+		for name in self.input_names:
+			if name in streamed:
+				self.stream_readers.append((name, lambda n=name: lj.stream_sample(n)))
+				tx = self.fallback_tx
+			else:
+				tx = self.read_tx
+
+			if name in lj.loadcells:
+				tx.read_loadcell_force(name)
+			elif name in lj.adc_pins:
+				tx.read_ain(name)
+			elif name.startswith("FIO") and name in lj.dio_pins:
+				tx.read_dio(name)
+			else:
+				raise ValueError(self._reject(name, "input"))
+
+		self.read_tx.packets()
+		self.fallback_tx.packets()
+
+		# --- Outputs --- #
+		self.dio_writers = []		# (pin, (cmd_low, cmd_high))
+		self.dac_writers = []		# pin names
+
+		for key in (controller.states if outputs is None else outputs):
+			if key.startswith("FIO") and key in lj.dio_pins:
+				io = lj.dio_pins[key]
+				self.dio_writers.append((key, (u6.BitStateWrite(io, 0), u6.BitStateWrite(io, 1))))
+			elif key in lj.dac_pins:
+				self.dac_writers.append(key)
+			else:
+				raise ValueError(self._reject(key, "output"))
+
+		self.write_tx = lj.transaction()
+		for pin, cmds in self.dio_writers:
+			self.write_tx.add(pin, cmds[0])
+		for pin in self.dac_writers:
+			self.write_tx.add(pin, dac_command(lj.dac_pins[pin], 0.0))
+		self.write_tx.packets()
+		self._written = [None] * len(self.write_tx.ops)		# value behind each command
+
+		# --- Row layout --- #
+		self.output_names = list(controller.states if outputs is None else outputs) + list(getattr(controller, "report_fields", []))
+		self.columns = ["Timestamp", "TimeABS", *self.input_names, *self.output_names]
+		self.row = dict.fromkeys(self.columns)
+
+
+	def _reject(self, name, role):
+		if name.startswith("EIO"):
+			return f"{name} ({role}): EIO pins are not supported by the acquisition loop."
+		return f"{name} ({role}): unknown pin, loadcell or channel."
+
+
+	def read(self):
+		"""
+		Reads every input and returns the (reused) inputs dict.
+		A streamed input without a fresh sample is read by Feedback for this tick.
+		"""
+
+		inputs = self.inputs
+		inputs.update(self.read_tx.execute())
+
+		missing = False
+		for name, reader in self.stream_readers:
+			inputs[name] = val = reader()
+			missing = missing or val is None
+
+		# Stream down or stale: never hand a frozen value to the controller
+		if missing:
+			if not self.stream_fallbacks:
+				self.lj.logger.warning("Stream samples missing or stale, streamed inputs read by Feedback.")
+			self.stream_fallbacks += 1
+			for name, val in self.fallback_tx.execute().items():
+				if inputs[name] is None:
+					inputs[name] = val
+
+		return inputs
+
+
+	def write(self, outputs):
+		"""
+		Applies the controller outputs with the prebuilt write transaction,
+		patching only the commands whose value changed since the last tick.
+		"""
+
+		tx = self.write_tx
+		written = self._written
+		i = 0
+
+		for pin, cmds in self.dio_writers:
+			val = outputs.get(pin)
+			if val is None:
+				return self._write_partial(outputs)
+			val = 1 if val else 0
+			if val != written[i]:
+				tx.patch(i, cmds[val])
+				written[i] = val
+			i += 1
+
+		for pin in self.dac_writers:
+			val = outputs.get(pin)
+			if val is None or not (0.0 <= val <= 5.0):
+				return self._write_partial(outputs)
+			if val != written[i]:
+				tx.patch(i, dac_command(self.lj.dac_pins[pin], val))
+				written[i] = val
+			i += 1
+
+		if tx.ops:
+			tx.execute()
+
+
+	def _write_partial(self, outputs):
+		"""Tick with missing (or out of range) outputs: one-off transaction of the valid ones"""
+
+		tx = self.lj.transaction()
+
+		for pin, cmds in self.dio_writers:
+			val = outputs.get(pin)
+			if val is not None:
+				tx.add(pin, cmds[1 if val else 0])
+
+		for pin in self.dac_writers:
+			val = outputs.get(pin)
+			if val is not None:
+				tx.write_dac(pin, val)
+
+		if tx.ops:
+			tx.execute()
+
+
+	def fill_row(self, timestamp, time_abs, inputs, outputs):
+		"""
+		Fills the preallocated row dict (column order) and returns it.
+		The same dict is refilled next tick: copy it to keep it (see loop_acquisition).
+		"""
+
+		row = self.row
+		row["Timestamp"] = timestamp
+		row["TimeABS"] = time_abs
+
+		for name in self.input_names:
+			row[name] = inputs[name]
+
+		for name in self.output_names:
+			row[name] = outputs.get(name)
+
+		return row
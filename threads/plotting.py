@@ -2,67 +2,193 @@
 
 import time
 import os
+import numpy as np
 import plotly.graph_objects as go
 import plotly.io as pio
 
+from plotly.subplots import make_subplots
 from collections import deque
 from queue import Empty
 
-def loop_plotting(plot_q, running, plot_file, plot_dir="logs/",	 interval: float = 60, maxlen = 5000):
+
+## -- Downsampling -- ##
+
+def minmax_downsample(x, y, n_out):
+	"""
+	Min/max decimation: keeps the min and max of y in n_out//2 equal buckets (time order kept).
+	x, y: numpy arrays (y without NaN). Returns (x, y).
+	"""
+
+	n = len(x)
+	if n <= n_out or n_out < 2:
+		return x, y
+
+	n_buckets = n_out // 2
+	size = -(-n // n_buckets)		# ceil
+	pad = n_buckets * size - n
+
+	yb = np.concatenate([y, np.full(pad, np.nan)]).reshape(n_buckets, size)
+	imin = np.argmin(np.where(np.isnan(yb), np.inf, yb), axis=1)
+	imax = np.argmax(np.where(np.isnan(yb), -np.inf, yb), axis=1)
+
+	offsets = np.arange(n_buckets) * size
+	idx = np.sort(np.stack([imin, imax], axis=1), axis=1) + offsets[:, None]
+	idx = np.unique(np.minimum(idx.ravel(), n - 1))
+
+	return x[idx], y[idx]
+
+
+def lttb(x, y, n_out):
+	"""
+	Largest-Triangle-Three-Buckets downsampling to n_out points.
+	x, y: numpy arrays (y without NaN). Returns (x, y).
+	"""
+
+	n = len(x)
+	if n <= n_out or n_out < 3:
+		return x, y
+
+	edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+	idx = np.empty(n_out, dtype=int)
+	idx[0] = 0
+	idx[-1] = n - 1
+
+	a = 0
+	for i in range(n_out - 2):
+		lo, hi = edges[i], edges[i + 1]
+		nlo = edges[i + 1]
+		nhi = edges[i + 2] if i + 2 < len(edges) else n
+
+		avg_x = x[nlo:nhi].mean()
+		avg_y = y[nlo:nhi].mean()
+
+		area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+		a = lo + int(np.argmax(area))
+		idx[i + 1] = a
+
+	return x[idx], y[idx]
+
+
+DOWNSAMPLERS = {
+	"lttb": lttb,
+	"minmax": minmax_downsample,
+	}
+
+
+class DecimatedHistory:
+	"""Whole-run history of one channel kept at coarse resolution (bounded memory, min/max preserved)"""
+
+	def __init__(self, target=2000):
+		self.target = target
+		self.x = np.empty(0)
+		self.y = np.empty(0)
+
+	def extend(self, xs, ys):
+		self.x = np.concatenate([self.x, xs])
+		self.y = np.concatenate([self.y, ys])
+		if len(self.x) > 2 * self.target:
+			self.x, self.y = minmax_downsample(self.x, self.y, self.target)
+
+
+def _xy(rows, channel):
+	"""Extracts (timestamps, values) arrays from rows, skipping missing values"""
+
+	pts = [(d["Timestamp"], d[channel]) for d in rows if d.get(channel) is not None]
+	if not pts:
+		return np.empty(0), np.empty(0)
+	xy = np.array(pts, dtype=float)
+	return xy[:, 0], xy[:, 1]
+
+
+def _drain(plot_q, channel):
+	"""
+	Every row waiting in plot_q as (timestamps, values) arrays, skipping missing values.
+	A RingReader hands its structured records directly (no row dicts).
+	"""
+
+	if hasattr(plot_q, "get_records"):
+		records = plot_q.get_records(timeout=0.0)
+		if not len(records):
+			return np.empty(0), np.empty(0)
+		y = records[channel].astype(float)
+		ok = ~np.isnan(y) if records.dtype[channel].kind == "f" else records[channel] >= 0
+		return records["Timestamp"][ok], y[ok]
+
+	new = []
+	while True:
+		try:
+			new.append(plot_q.get(block = False))
+		except Empty:
+			break
+	return _xy(new, channel)
+
+
+def loop_plotting(plot_q, running, plot_file, plot_dir="logs/",	 interval: float = 60, maxlen = 5000, channel="LC0", n_points=2000, method="lttb"):
 	"""
 	Thread to plot data from plot_q.
-	Continiously extract data from plot_q until its empty. 
+	Continiously extract data from plot_q until its empty.
 	Then generate a graph, and sleep for interval.
+	- Top: whole run history, downsampled to n_points with method ("lttb" or "minmax")
+	- Bottom: last maxlen samples (with a value) at full resolution
+	plotly.js is written once next to the HTML file (keeps each HTML small).
 	"""
-	
+
 	plot_bf = deque(maxlen = maxlen)
+	history = DecimatedHistory(n_points)
+	downsample = DOWNSAMPLERS[method]
 	fig = None
-	
+
 	try:
 		while running.is_set() or not plot_q.empty():
-			
+
 			# Getting all data in the queue
-			while True:
-				try:
-					data = plot_q.get(block = False)
-					plot_bf.append(data)
-				except Empty:
-					break
-			
+			new_x, new_y = _drain(plot_q, channel)
+			plot_bf.extend(zip(new_x.tolist(), new_y.tolist()))
+			history.extend(new_x, new_y)
+
 			# Parsing data & making the plot
 			if len(plot_bf) > 1:
-				timestamps = [d["Timestamp"] for d in plot_bf]
-				lc0_vals = [d["LC0"] for d in plot_bf]
-			
-				fig = go.Figure()
-			
-				fig.add_trace(go.Scatter(
-					x=timestamps,
-					y=lc0_vals,
-					mode='lines+markers',
-					name='LC0'
-					))
-				
-				fig.update_layout(
-					xaxis_title='Time [s]',
-					yaxis_title='Force [kg]',
-					#yaxis_range=[0,5]
+				x, y = np.array(plot_bf).T
+				hx, hy = downsample(history.x, history.y, n_points)
+
+				fig = make_subplots(
+					rows = 2,
+					cols = 1,
+					subplot_titles = ("Whole run (decimated)", f"Last {len(plot_bf)} samples")
 					)
 
+				fig.add_trace(go.Scattergl(
+					x=hx,
+					y=hy,
+					mode='lines',
+					name=f'{channel} (history)'
+					), row=1, col=1)
+
+				fig.add_trace(go.Scattergl(
+					x=x,
+					y=y,
+					mode='lines',
+					name=channel
+					), row=2, col=1)
+
+				fig.update_xaxes(title_text='Time [s]', row=2, col=1)
+				fig.update_yaxes(title_text='Force [kg]')
+
 				pio.write_html(
 					fig,
 					file=os.path.join(plot_dir, plot_file),
+					include_plotlyjs="directory",
 					auto_open=False
 					)
-			
+
 			total = 0
 			while total < interval and running.is_set():
 				time.sleep(1)
 				total += 1
-	
+
 	except Exception as e:
 		print(f"Error in plotting thread: {e}")
 		time.sleep(0.01)
-	
+
 	finally:
 		print("Plot thread closed.")
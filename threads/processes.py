@@ -0,0 +1,245 @@
+# threads/processes.py
+#
+# Process-based runtime: logging, plotting and HMI run in worker processes,
+# fed through a shared-memory ring (threads.ringbuffer) or batches of rows in multiprocessing queues.
+# Acquisition and control stay in the main process (see main_process.py).
+
+import queue
+import signal
+import threading
+import time
+
+from collections import deque
+
+from .logging import loop_logging
+from .plotting import loop_plotting
+from .hmi import TerminalRenderer
+from .ringbuffer import RingSpec, SharedRing
+
+
+class BatchPipe:
+	"""
+	Producer side (acquisition process): rows are grouped in batches of batch_rows
+	(or every max_delay seconds) and sent to a multiprocessing.Queue.
+	Never blocks the acquisition: a batch that does not fit is dropped and counted.
+	Same put/stats interface as threads.queues.SampleQueue.
+	"""
+
+	policy = "count_and_drop"
+
+	def __init__(self, mp_queue, batch_rows=200, max_delay=0.1):
+		self.q = mp_queue
+		self.batch_rows = batch_rows
+		self.max_delay = max_delay
+
+		self.batch = []
+		self._t0 = time.monotonic()
+
+		self.put_count = 0
+		self.dropped = 0
+		self.max_depth = 0
+		self.closed = False
+
+
+	def put(self, row, block=True, timeout=None):
+		self.batch.append(row)
+		self.put_count += 1
+
+		if len(self.batch) >= self.batch_rows or time.monotonic() - self._t0 > self.max_delay:
+			return self.flush()
+		return True
+
+
+	def flush(self):
+		"""Sends the current batch. Returns False if it was dropped."""
+
+		batch, self.batch = self.batch, []
+		self._t0 = time.monotonic()
+		if not batch:
+			return True
+
+		try:
+			self.q.put_nowait(batch)
+		except queue.Full:
+			self.dropped += len(batch)
+			return False
+
+		depth = self._qsize()
+		if depth > self.max_depth:
+			self.max_depth = depth
+		return True
+
+
+	def close(self):
+		"""Sends the last batch and the end marker: the final stats dict (consumers then finish)"""
+
+		if self.closed:
+			return
+		self.flush()
+		self.q.put(self.stats())
+		self.closed = True
+
+
+	def _qsize(self):
+		try:
+			return self.q.qsize()
+		except NotImplementedError:		# macOS
+			return 0
+
+
+	def stats(self):
+		"""Pipe counters (depth in batches waiting in the queue)"""
+		return {
+			"depth": self._qsize(),
+			"max_depth": self.max_depth,
+			"dropped": self.dropped,
+			"put": self.put_count,
+			}
+
+
+class BatchReader:
+	"""
+	Consumer side (worker process) of a BatchPipe, with the SampleQueue reading interface
+	(get, get_batch, empty, stats) so loop_logging / loop_plotting run unchanged.
+	empty() only becomes True after the producer closed the pipe and every row was read.
+	"""
+
+	policy = BatchPipe.policy
+
+	def __init__(self, mp_queue):
+		self.q = mp_queue
+		self.buf = deque()
+		self.closed = False
+		self.count = 0
+		self.max_depth = 0
+		self.producer_stats = None
+
+
+	def _fetch(self, block, timeout=None):
+		if self.closed:
+			return
+		try:
+			batch = self.q.get(block, timeout)
+		except queue.Empty:
+			return
+		if isinstance(batch, dict):		# end marker
+			self.producer_stats = batch
+			self.closed = True
+		else:
+			self.buf.extend(batch)
+			self.count += len(batch)
+			self.max_depth = max(self.max_depth, len(self.buf))
+
+
+	def get(self, block=True, timeout=None):
+		if not self.buf:
+			self._fetch(block, timeout)
+		if not self.buf:
+			raise queue.Empty
+		return self.buf.popleft()
+
+
+	def get_batch(self, max_items=None, timeout=0.1):
+		if not self.buf:
+			self._fetch(True, timeout)
+
+		n = len(self.buf) if max_items is None else min(len(self.buf), max_items)
+		return [self.buf.popleft() for _ in range(n)]
+
+
+	def empty(self):
+		if not self.buf:
+			self._fetch(False)
+		return self.closed and not self.buf
+
+
+	def stats(self):
+		"""Rows buffered here (max_depth in rows), drops counted by the producer (known once closed)"""
+		dropped = self.producer_stats["dropped"] if self.producer_stats else 0
+		return {"depth": len(self.buf), "max_depth": self.max_depth, "dropped": dropped, "put": self.count}
+
+
+def _open_source(source):
+	"""Reader of a worker input: RingSpec (shared-memory ring) or multiprocessing.Queue (BatchPipe)"""
+
+	if isinstance(source, RingSpec):
+		ring = SharedRing.attach(source)
+		return ring, ring.reader("oldest")
+	return None, BatchReader(source)
+
+
+def _worker_init():
+	# Ctrl+C is handled by the main process, which then stops the workers in order
+	signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+## -- Worker processes -- ##
+
+def proc_logging(source, running, dl_kwargs, max_batch=5000):
+	"""Logging process: DataLogger(**dl_kwargs) fed by a ring or a BatchPipe. Final save_csv on exit."""
+
+	_worker_init()
+	from DataLogger import DataLogger
+
+	dl = DataLogger(**dl_kwargs)
+	ring, reader = _open_source(source)
+	try:
+		loop_logging(dl, reader, running, threading.Event(), max_batch)
+	finally:
+		if ring is not None:
+			ring.release()
+
+
+def proc_plotting(source, running, plot_file, plot_dir="logs/", interval=60, **kwargs):
+	"""Plotting process: loop_plotting fed by a ring or a BatchPipe"""
+
+	_worker_init()
+	ring, reader = _open_source(source)
+	try:
+		loop_plotting(reader, running, plot_file, plot_dir, interval, **kwargs)
+	finally:
+		if ring is not None:
+			ring.release()
+
+
+def proc_hmi(status_q, running, title, rows, label_width=16):
+	"""HMI process: renders the value lists published by loop_status (None ends it)"""
+
+	_worker_init()
+	renderer = TerminalRenderer(title, rows, label_width)
+
+	try:
+		while running.is_set():
+			try:
+				values = status_q.get(timeout=0.5)
+			except queue.Empty:
+				continue
+			if values is None:
+				break
+			renderer.update(values)
+
+	finally:
+		renderer.close()
+
+
+## -- Acquisition process side -- ##
+
+def loop_status(view, status_q, running, refresh=0.1):
+	"""
+	Thread (acquisition process) publishing the HmiView values to proc_hmi.
+	Only short strings cross the process boundary; stale values are dropped.
+	"""
+
+	try:
+		while running.is_set() and view.controller.phase != "end_of_test":
+			try:
+				status_q.put_nowait(view.values())
+			except queue.Full:
+				pass
+			time.sleep(refresh)
+
+	finally:
+		try:
+			status_q.put(None, timeout=1.0)
+		except queue.Full:
+			pass
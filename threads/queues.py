@@ -0,0 +1,134 @@
+# threads/queues.py
+
+import queue
+
+
+class SampleQueue(queue.Queue):
+	"""
+	queue.Queue with an overflow policy, bulk draining and depth counters.
+	policy (when maxsize > 0 and the queue is full):
+	- "block": put() waits for room (same as queue.Queue)
+	- "drop_oldest": the oldest item is discarded to make room
+	- "count_and_drop": the new item is discarded
+	Dropped items are counted in self.dropped.
+	"""
+
+	POLICIES = ("block", "drop_oldest", "count_and_drop")
+	copies_rows = False		# items are kept as they are put
+
+	def __init__(self, maxsize=0, policy="block"):
+
+		if policy not in self.POLICIES:
+			raise ValueError(f"Invalid overflow policy '{policy}'. Expected one of {self.POLICIES}")
+
+		super().__init__(maxsize)
+		self.policy = policy
+
+		# Counters
+		self.put_count = 0
+		self.max_depth = 0
+		self.dropped = 0
+
+
+	def _put(self, item):
+		# Called by queue.Queue with self.mutex held
+		self.queue.append(item)
+		self.put_count += 1
+		if len(self.queue) > self.max_depth:
+			self.max_depth = len(self.queue)
+
+
+	def put(self, item, block=True, timeout=None):
+		"""Puts an item, applying the overflow policy. Returns False if the item was dropped."""
+
+		if self.policy == "block" or self.maxsize <= 0:
+			super().put(item, block, timeout)
+			return True
+
+		with self.mutex:
+			if self._qsize() >= self.maxsize:
+				self.dropped += 1
+				if self.policy == "count_and_drop":
+					return False
+				self.queue.popleft()
+				self.unfinished_tasks -= 1
+
+			self._put(item)
+			self.unfinished_tasks += 1
+			self.not_empty.notify()
+
+		return True
+
+
+	def get_batch(self, max_items=None, timeout=0.1):
+		"""
+		Waits up to timeout for at least one item, then returns every available item
+		(at most max_items) as a list. Returns [] on timeout.
+		"""
+
+		with self.not_empty:
+			if not self._qsize():
+				self.not_empty.wait(timeout)
+
+			n = self._qsize()
+			if max_items is not None:
+				n = min(n, max_items)
+
+			batch = [self.queue.popleft() for _ in range(n)]
+
+			if n:
+				self.not_full.notify_all()
+
+		return batch
+
+
+	def stats(self):
+		"""Returns a snapshot of the queue counters"""
+
+		with self.mutex:
+			return {
+				"depth": self._qsize(),
+				"max_depth": self.max_depth,
+				"dropped": self.dropped,
+				"put": self.put_count,
+				}
+
+
+class RowRouter:
+	"""
+	Splits each merged acquisition row of a ControllerGroup into one row per controller,
+	put in that controller's own queue (own log stream). Used in place of data_q.
+	"""
+
+	copies_rows = True		# put() builds new per-controller rows
+
+	def __init__(self, group, queues):
+		missing = set(group.controllers) - set(queues)
+		if missing:
+			raise ValueError(f"No queue for controllers {sorted(missing)}")
+
+		self.group = group
+		self.queues = queues
+
+
+	def put(self, row, block=True, timeout=None):
+		ok = True
+		for name, own in self.group.split_row(row):
+			ok = self.queues[name].put(own, block, timeout) is not False and ok
+		return ok
+
+
+	def empty(self):
+		return all(q.empty() for q in self.queues.values())
+
+
+	def stats(self):
+		"""Aggregated counters of every queue"""
+
+		stats = [q.stats() for q in self.queues.values()]
+		return {
+			"depth": sum(s["depth"] for s in stats),
+			"max_depth": max(s["max_depth"] for s in stats),
+			"dropped": sum(s["dropped"] for s in stats),
+			"put": sum(s["put"] for s in stats),
+			}
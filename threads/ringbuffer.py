@@ -0,0 +1,259 @@
+# threads/ringbuffer.py
+
+import math
+import time
+
+from collections import namedtuple
+from multiprocessing import shared_memory
+from queue import Empty
+
+import numpy as np
+
+
+# Column kinds (same vocabulary as storage.columnar): numpy dtype and null value
+RING_KINDS = {
+	"float": ("<f8", math.nan),
+	"int": ("<f8", math.nan),
+	"bool": ("i1", -1),
+	"str": ("<U24", ""),
+	}
+
+HEADER = 2		# int64 slots: [records written, closed flag]
+
+
+RingSpec = namedtuple("RingSpec", ["name", "schema", "capacity"])
+
+
+def ring_schema(plan):
+	"""
+	[(column, kind)] of an acquisition plan rows:
+	- DIO pins: bool as inputs, int as outputs ("dev:pin" names allowed)
+	- controller report fields: controller.report_kinds (default float)
+	- everything else (time, AIN, loadcells, DAC): float
+	"""
+
+	report_kinds = getattr(plan.controller, "report_kinds", {})
+	inputs = set(plan.input_names)
+	schema = []
+
+	for name in plan.columns:
+		pin = name.rsplit(":", 1)[-1]
+		if name in report_kinds:
+			kind = report_kinds[name]
+		elif pin[:3] in ("FIO", "EIO", "CIO", "MIO"):
+			kind = "bool" if name in inputs else "int"
+		else:
+			kind = "float"
+		schema.append((name, kind))
+
+	return schema
+
+
+class SharedRing:
+	"""
+	Single-producer multi-consumer ring buffer of fixed-schema records in shared memory.
+	The producer writes each row once in a slot, then publishes it by bumping the write counter.
+	Each consumer (RingReader) keeps its own cursor: nothing is copied per consumer,
+	and a consumer too slow to follow detects the overwritten records (overruns).
+	Works between threads (same object) and processes (attach a RingSpec in the worker).
+	Same put() as threads.queues.SampleQueue, so it can replace data_q / plot_q.
+	"""
+
+	copies_rows = True		# put() stores the values, not the row dict
+
+	def __init__(self, schema, capacity=65536, name=None):
+
+		self.schema = [tuple(c) for c in schema]
+		self.capacity = capacity
+		self.dtype = np.dtype([(col, RING_KINDS[kind][0]) for col, kind in self.schema])
+		self.owner = name is None
+
+		size = HEADER * 8 + capacity * self.dtype.itemsize
+		self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+
+		self.header = np.ndarray((HEADER,), dtype=np.int64, buffer=self.shm.buf)
+		self.data = np.ndarray((capacity,), dtype=self.dtype, buffer=self.shm.buf, offset=HEADER * 8)
+		if self.owner:
+			self.header[:] = 0
+
+		# Encoding of a row dict into a record tuple (None -> null value of the kind)
+		self._cols = [(col, RING_KINDS[kind][1]) for col, kind in self.schema]
+
+
+	@classmethod
+	def attach(cls, spec):
+		"""Opens an existing ring from its RingSpec (e.g. in a worker process)"""
+		return cls(spec.schema, spec.capacity, spec.name)
+
+
+	def spec(self):
+		"""Picklable description of the ring, to attach it from another process"""
+		return RingSpec(self.shm.name, self.schema, self.capacity)
+
+
+	@property
+	def written(self):
+		return int(self.header[0])
+
+
+	@property
+	def closed(self):
+		return bool(self.header[1])
+
+
+	## -- Producer -- ##
+
+	def put(self, row, block=True, timeout=None):
+		"""Publishes one row (dict). Never blocks: old records are overwritten."""
+
+		seq = int(self.header[0])
+		self.data[seq % self.capacity] = tuple(
+			null if (v := row.get(col)) is None else v for col, null in self._cols
+			)
+		self.header[0] = seq + 1
+		return True
+
+
+	def close(self):
+		"""Marks the end of the stream (readers then report empty once caught up)"""
+		self.header[1] = 1
+
+
+	## -- Consumers -- ##
+
+	def reader(self, start="now"):
+		"""New consumer cursor, from the next record ("now") or the oldest one kept ("oldest")"""
+		return RingReader(self, start)
+
+
+	def release(self):
+		"""Closes this mapping (and frees the shared memory if this side created it)"""
+
+		self.header = None
+		self.data = None
+		self.shm.close()
+		if self.owner:
+			self.shm.unlink()
+
+
+class RingReader:
+	"""
+	Consumer cursor on a SharedRing, with the SampleQueue reading interface
+	(get, get_batch, empty, stats) returning row dicts, so loop_logging / loop_dashboard run
+	unchanged. get_records returns the structured records instead (no per-row dicts, used by
+	loop_plotting). Records overwritten before being read are counted as dropped.
+	"""
+
+	policy = "overwrite"
+
+	def __init__(self, ring, start="now"):
+
+		self.ring = ring
+		self.cursor = ring.written if start == "now" else max(0, ring.written - ring.capacity)
+		self.count = 0
+		self.dropped = 0
+		self.max_depth = 0
+
+		self._decoders = [(col, _decoder(kind)) for col, kind in ring.schema]
+
+
+	def _read(self, max_items=None):
+		"""Copies the available records (oldest first) and advances the cursor"""
+
+		ring = self.ring
+		cap = ring.capacity
+		written = ring.written
+
+		# Records already overwritten
+		if written - self.cursor > cap:
+			self.dropped += written - self.cursor - cap
+			self.cursor = written - cap
+
+		n = written - self.cursor
+		self.max_depth = max(self.max_depth, n)
+		if max_items is not None:
+			n = min(n, max_items)
+		if n <= 0:
+			return None
+
+		start = self.cursor % cap
+		if start + n <= cap:
+			records = ring.data[start:start + n].copy()
+		else:
+			records = np.concatenate([ring.data[start:], ring.data[:start + n - cap]])
+
+		# Records overwritten while copying are torn: skip them. put() writes slot seq % cap
+		# before publishing seq + 1, so record (written - cap) may be half-written too.
+		torn = ring.written + 1 - cap - self.cursor
+		if torn > 0:
+			self.dropped += min(torn, n)
+			records = records[torn:]
+
+		self.cursor += n
+		self.count += len(records)
+		return records
+
+
+	def _rows(self, records):
+		if records is None or not len(records):
+			return []
+		cols = [(col, dec, records[col].tolist()) for col, dec in self._decoders]
+		return [{col: dec(values[i]) for col, dec, values in cols} for i in range(len(records))]
+
+
+	def get_records(self, max_items=None, timeout=0.1):
+		"""
+		Every available record (at most max_items) as one structured numpy array, waiting up to
+		timeout for the first one: a single copy out of shared memory, no row dicts.
+		Missing values are the RING_KINDS nulls (NaN, -1 for bool, "" for str).
+		"""
+
+		deadline = time.monotonic() + timeout
+		records = self._read(max_items)
+		while records is None and not self.ring.closed and time.monotonic() < deadline:
+			time.sleep(0.005)
+			records = self._read(max_items)
+		return records if records is not None else np.empty(0, dtype=self.ring.dtype)
+
+
+	def get_batch(self, max_items=None, timeout=0.1):
+		"""Every available row (at most max_items), waiting up to timeout for the first one"""
+
+		return self._rows(self.get_records(max_items, timeout))
+
+
+	def get(self, block=True, timeout=None):
+		if not block:
+			timeout = 0.0
+		elif timeout is None:
+			timeout = math.inf
+
+		rows = self.get_batch(1, timeout)
+		if not rows:
+			raise Empty
+		return rows[0]
+
+
+	def empty(self):
+		return self.ring.written <= self.cursor and self.ring.closed
+
+
+	def stats(self):
+		return {
+			"depth": self.ring.written - self.cursor,
+			"max_depth": self.max_depth,
+			"dropped": self.dropped,
+			"put": self.ring.written,
+			}
+
+
+def _decoder(kind):
+	"""Record value -> logged value (None for the null value)"""
+
+	if kind == "bool":
+		return lambda v: None if v < 0 else bool(v)
+	if kind == "int":
+		return lambda v: None if v != v else int(v)
+	if kind == "str":
+		return lambda v: v or None
+	return lambda v: None if v != v else v
@@ -0,0 +1,368 @@
+# tools/analyze.py
+#
+# Post-run analysis of DataLogger output (.csv, .csv.gz or columnar .ljcol), vectorized with numpy:
+# cycles are segmented from the phase / cycle_count columns, then per-cycle and per-run statistics
+# (peak force, phase durations, CPM over time) are written with a downsampled plot.
+# Several runs are analysed in parallel (one process per file).
+# Usage: python -m tools.analyze logs/BrakeTest_*.csv [-o out_dir] [-j jobs] [--prefix brake.] [--force LC0]
+#
+# Outputs per run (in out_dir, default next to the run file):
+#   <stem>_analysis_cycles.csv   one row per cycle
+#   <stem>_analysis.json         run summary
+#   <stem>_analysis.html         downsampled plots
+# and summary.csv (one row per run) in out_dir when several runs are given.
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+## -- Loading -- ##
+
+def _stem(path):
+	name = os.path.basename(path)
+	for ext in (".gz", ".csv", ".ljcol"):
+		if name.endswith(ext):
+			name = name[:-len(ext)]
+	return name
+
+
+class _Categories:
+	"""String column -> int32 codes, categories shared across chunks"""
+
+	def __init__(self):
+		self.names = []
+		self._codes = {}
+
+	def encode(self, values):
+		uniq, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+		lut = np.array([self._code(u) for u in uniq.tolist()], dtype=np.int32)
+		return lut[inverse]
+
+	def _code(self, name):
+		if name == "":
+			return -1
+		if name not in self._codes:
+			self._codes[name] = len(self.names)
+			self.names.append(name)
+		return self._codes[name]
+
+
+def _floats(values):
+	"""CSV cells -> float64 array (empty cells -> NaN)"""
+	return np.array([v or "nan" for v in values], dtype=np.float64)
+
+
+def load_run(path, prefix="", force="LC0", chunk_rows=200_000):
+	"""
+	Loads the columns needed for the analysis, chunk by chunk:
+	{"t", "force" (or None), "cycle", "phase" (int32 codes, -1 = missing), "phases" (names)}
+	prefix selects one controller of a ControllerGroup run (e.g. "brake." for brake.phase).
+	"""
+
+	if path.endswith(".ljcol"):
+		return _load_columnar(path, prefix, force)
+
+	opener = gzip.open if path.endswith(".gz") else open
+	cats = _Categories()
+	parts = {"t": [], "force": [], "cycle": [], "phase": []}
+
+	with opener(path, "rt", newline="") as f:
+		reader = csv.reader(f)
+		header = next(reader)
+		col = {name: i for i, name in enumerate(header)}
+
+		for name in (f"{prefix}phase", f"{prefix}cycle_count"):
+			if name not in col:
+				raise ValueError(f"{path}: no '{name}' column")
+		i_t = col["Timestamp"]
+		i_phase = col[f"{prefix}phase"]
+		i_cycle = col[f"{prefix}cycle_count"]
+		i_force = col.get(force)
+
+		while True:
+			chunk = [row for _, row in zip(range(chunk_rows), reader)]
+			if not chunk:
+				break
+			cols = list(zip(*chunk))
+
+			parts["t"].append(_floats(cols[i_t]))
+			parts["cycle"].append(_floats(cols[i_cycle]))
+			parts["phase"].append(cats.encode(cols[i_phase]))
+			if i_force is not None:
+				parts["force"].append(_floats(cols[i_force]))
+
+	def cat(name, dtype):
+		return np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=dtype)
+
+	return {
+		"t": cat("t", np.float64),
+		"force": cat("force", np.float64) if i_force is not None else None,
+		"cycle": cat("cycle", np.float64),
+		"phase": cat("phase", np.int32),
+		"phases": cats.names,
+		}
+
+
+def _load_columnar(path, prefix, force):
+	from storage.columnar import ColumnReader
+
+	reader = ColumnReader(path)
+	try:
+		return {
+			"t": np.array(reader.column("Timestamp"), dtype=np.float64),
+			"force": np.array(reader.column(force), dtype=np.float64) if force in reader.columns else None,
+			"cycle": np.array(reader.column(f"{prefix}cycle_count"), dtype=np.float64),
+			"phase": np.array(reader.column(f"{prefix}phase"), dtype=np.int32),
+			"phases": list(reader.categories[f"{prefix}phase"]),
+			}
+	finally:
+		reader.close()
+
+
+## -- Segmentation and statistics -- ##
+
+def segment_phases(phase):
+	"""Start index of each run of identical phase codes (vectorized), with the row count appended"""
+	starts = np.flatnonzero(np.diff(phase)) + 1
+	return np.concatenate([[0], starts, [len(phase)]]) if len(phase) else np.zeros(1, dtype=int)
+
+
+def analyze_run(run):
+	"""
+	Per-cycle table and run summary of a loaded run.
+	A cycle starts on the row where cycle_count changes (controllers count a cycle when it starts);
+	its duration runs to the next cycle start. Phase durations use the time of the next phase change.
+	"""
+
+	t, cycle, phase = run["t"], run["cycle"], run["phase"]
+	n = len(t)
+	names = run["phases"]
+
+	if n < 2:
+		return {"cycle": np.empty(0)}, {"rows": n, "cycles": 0}
+
+	# Phase segments: [start, end) row ranges, durations up to the next segment start
+	bounds = segment_phases(phase)
+	seg_start = bounds[:-1]
+	seg_t = np.append(t[seg_start], t[-1])
+	seg_dur = np.diff(seg_t)
+	seg_phase = phase[seg_start]
+
+	# Cycle segments (rows with a valid count only). The run ends at the first end_of_test row:
+	# the count bumped on that row (controllers count a cycle before checking max_cycles) is not a cycle.
+	end_code = names.index("end_of_test") if "end_of_test" in names else None
+	ends = np.flatnonzero(phase == end_code) if end_code is not None else np.empty(0, dtype=int)
+	end_row = int(ends[0]) if len(ends) else n
+
+	valid = ~np.isnan(cycle)
+	cyc = np.where(valid, cycle, -1)
+	c_start = np.flatnonzero(cyc != np.concatenate([[-1], cyc[:-1]]))
+	c_start = c_start[(cyc[c_start] > 0) & (c_start < end_row)]
+	if not len(c_start):
+		return {"cycle": np.empty(0)}, {"rows": n, "cycles": 0, "span_s": float(t[-1] - t[0])}
+
+	c_t0 = t[c_start]
+	c_t1 = np.append(t[c_start[1:]], t[min(end_row, n - 1)])
+	table = {
+		"cycle": cyc[c_start].astype(np.int64),
+		"t_start": c_t0,
+		"duration": c_t1 - c_t0,
+		}
+
+	# Last cycle incomplete unless the run reached end_of_test
+	complete = np.ones(len(c_start), dtype=bool)
+	complete[-1] = end_row < n
+	table["complete"] = complete
+
+	# Peak force per cycle (min and max, NaN ignored)
+	force = run["force"]
+	if force is not None:
+		f = force[:end_row]
+		lo = np.where(np.isnan(f), np.inf, f)
+		hi = np.where(np.isnan(f), -np.inf, f)
+		fmin = np.minimum.reduceat(lo, c_start)
+		fmax = np.maximum.reduceat(hi, c_start)
+		table["force_min"] = np.where(np.isinf(fmin), np.nan, fmin)
+		table["force_max"] = np.where(np.isinf(fmax), np.nan, fmax)
+
+	# Time spent in each phase per cycle (phase segments assigned to the cycle they start in)
+	seg_cycle = np.searchsorted(c_start, seg_start, side="right") - 1
+	keep = (seg_cycle >= 0) & (seg_phase >= 0)
+	durations = np.zeros((len(c_start), len(names)))
+	np.add.at(durations, (seg_cycle[keep], seg_phase[keep]), seg_dur[keep])
+	for code, name in enumerate(names):
+		if name != "end_of_test":
+			table[f"t_{name}"] = durations[:, code]
+
+	# CPM over time (at each cycle end)
+	with np.errstate(divide="ignore"):
+		table["cpm"] = np.where(table["duration"] > 0, 60.0 / table["duration"], np.nan)
+
+	done = table["duration"][complete]
+	summary = {
+		"rows": n,
+		"span_s": float(t[-1] - t[0]),
+		"cycles": int(len(c_start)),
+		"last_cycle": int(table["cycle"][-1]),
+		"complete_cycles": int(complete.sum()),
+		"ended": bool(complete[-1]),
+		"cycle_s": _describe(done),
+		"cpm_mean": float(60.0 * len(done) / done.sum()) if done.sum() > 0 else None,
+		"phase_s": {name: _describe(durations[complete, code]) for code, name in enumerate(names) if name != "end_of_test"},
+		"phase_transitions": int(len(seg_start) - 1),
+		}
+	if force is not None:
+		summary["force_min"] = _describe(table["force_min"][complete])
+		summary["force_max"] = _describe(table["force_max"][complete])
+
+	return table, summary
+
+
+def _describe(x):
+	x = x[~np.isnan(x)]
+	if not len(x):
+		return None
+	p50, p99 = np.percentile(x, [50, 99])
+	return {"mean": float(x.mean()), "std": float(x.std()), "min": float(x.min()), "p50": float(p50), "p99": float(p99), "max": float(x.max())}
+
+
+## -- Outputs -- ##
+
+def write_cycles(table, path):
+	keys = list(table)
+	with open(path, "w", newline="") as f:
+		writer = csv.writer(f)
+		writer.writerow(keys)
+		writer.writerows(zip(*[table[k].tolist() for k in keys]))
+
+
+def plot_run(run, table, path, title, n_points=2000):
+	"""Force over time (min/max decimated), per-cycle peaks, CPM and phase durations"""
+
+	import plotly.graph_objects as go
+	from plotly.subplots import make_subplots
+	from threads.plotting import minmax_downsample
+
+	def decimate(x, y):
+		ok = ~np.isnan(y)
+		return minmax_downsample(x[ok], y[ok], n_points)
+
+	has_force = run["force"] is not None
+	fig = make_subplots(rows=3, cols=1, shared_xaxes=False, vertical_spacing=0.08,
+		subplot_titles=("Force over time" if has_force else "Cycle count over time", "Per cycle", "Phase durations per cycle"))
+
+	if has_force:
+		x, y = decimate(run["t"], run["force"])
+		fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name="force"), row=1, col=1)
+	else:
+		x, y = decimate(run["t"], run["cycle"])
+		fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name="cycle_count"), row=1, col=1)
+
+	if len(table["cycle"]):
+		c = table["cycle"].astype(np.float64)
+		for key in ("force_min", "force_max", "cpm"):
+			if key in table:
+				x, y = decimate(c, table[key])
+				fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=key), row=2, col=1)
+		for key in table:
+			if key.startswith("t_"):
+				x, y = decimate(c, table[key])
+				fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=key), row=3, col=1)
+
+	fig.update_layout(title=title, height=1000)
+	fig.write_html(path, include_plotlyjs="cdn")
+
+
+def analyze_file(path, out_dir=None, prefix="", force="LC0", plot=True):
+	"""Loads, analyses and writes the outputs of one run. Returns the summary dict."""
+
+	t0 = time.perf_counter()
+	out_dir = out_dir or os.path.dirname(path) or "."
+	stem = _stem(path)
+
+	run = load_run(path, prefix, force)
+	table, summary = analyze_run(run)
+
+	base = os.path.join(out_dir, f"{stem}_analysis")
+	write_cycles(table, base + "_cycles.csv")
+	if plot:
+		plot_run(run, table, base + ".html", stem)
+
+	summary = {"file": path, **summary, "analysis_s": time.perf_counter() - t0}
+	with open(base + ".json", "w") as f:
+		json.dump(summary, f, indent=1)
+	return summary
+
+
+def _summary_row(s):
+	cyc = s.get("cycle_s") or {}
+	fmin = s.get("force_min") or {}
+	return {
+		"file": s["file"],
+		"rows": s["rows"],
+		"span_s": s.get("span_s"),
+		"cycles": s["cycles"],
+		"ended": s.get("ended"),
+		"cpm_mean": s.get("cpm_mean"),
+		"cycle_p50_s": cyc.get("p50"),
+		"cycle_p99_s": cyc.get("p99"),
+		"force_min_p50": fmin.get("p50"),
+		}
+
+
+def main(argv):
+
+	parser = argparse.ArgumentParser(prog="python -m tools.analyze", description="Post-run analysis of DataLogger files")
+	parser.add_argument("files", nargs="+", help=".csv, .csv.gz or .ljcol run files")
+	parser.add_argument("-o", "--out-dir", default=None, help="output directory (default: next to each file)")
+	parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+	parser.add_argument("--prefix", default="", help="controller prefix of a ControllerGroup run, e.g. brake.")
+	parser.add_argument("--force", default="LC0", help="force column (default LC0)")
+	parser.add_argument("--no-plot", action="store_true")
+	args = parser.parse_args(argv)
+
+	if args.out_dir:
+		os.makedirs(args.out_dir, exist_ok=True)
+
+	t0 = time.perf_counter()
+	jobs = min(args.jobs or os.cpu_count() or 1, len(args.files))
+	call = (args.out_dir, args.prefix, args.force, not args.no_plot)
+
+	summaries = []
+	with ProcessPoolExecutor(max_workers=jobs) as pool:
+		futures = {pool.submit(analyze_file, path, *call): path for path in args.files}
+		for fut, path in futures.items():
+			try:
+				s = fut.result()
+			except Exception as e:
+				print(f"[ANALYZE] {path}: {e}")
+				continue
+			summaries.append(s)
+			cyc = s.get("cycle_s") or {}
+			print(f"[ANALYZE] {path}: {s['rows']} rows, {s['cycles']} cycles, "
+				f"cycle p50 {cyc.get('p50', float('nan')):.3f}s, {s['analysis_s']:.2f}s")
+
+	if len(summaries) > 1:
+		out = os.path.join(args.out_dir or os.path.dirname(args.files[0]) or ".", "summary.csv")
+		rows = [_summary_row(s) for s in summaries]
+		with open(out, "w", newline="") as f:
+			writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+			writer.writeheader()
+			writer.writerows(rows)
+		print(f"[ANALYZE] summary -> {out}")
+
+	print(f"[ANALYZE] {len(summaries)}/{len(args.files)} runs in {time.perf_counter() - t0:.2f}s")
+	return 0 if len(summaries) == len(args.files) else 1
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
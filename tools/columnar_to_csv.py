@@ -0,0 +1,27 @@
+# tools/columnar_to_csv.py
+#
+# Converts a DataLogger columnar chunk file (.ljcol) to the usual CSV layout.
+# Usage: python -m tools.columnar_to_csv logs/BrakeTest_02.ljcol [logs/BrakeTest_02.csv]
+
+import os
+import sys
+
+from storage.columnar import export_csv
+
+
+def main(argv):
+	
+	if not argv:
+		print("Usage: python -m tools.columnar_to_csv <file.ljcol> [out.csv]")
+		return 1
+	
+	src = argv[0]
+	dst = argv[1] if len(argv) > 1 else os.path.splitext(src)[0] + ".csv"
+	
+	n = export_csv(src, dst)
+	print(f"[EXPORT] {n} rows -> {dst}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
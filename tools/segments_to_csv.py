@@ -0,0 +1,42 @@
+# tools/segments_to_csv.py
+#
+# Joins the rotating segments of a DataLogger run (optionally only a time range) into one CSV.
+# Usage: python -m tools.segments_to_csv logs/BrakeTest_02.manifest.json [out.csv] [t_start] [t_end]
+
+import csv
+import sys
+
+from storage.segments import read_manifest, iter_segment_rows
+
+
+def main(argv):
+	
+	if not argv:
+		print("Usage: python -m tools.segments_to_csv <manifest.json> [out.csv] [t_start] [t_end]")
+		return 1
+	
+	src = argv[0]
+	dst = argv[1] if len(argv) > 1 else src.replace(".manifest.json", "") + ".csv"
+	t_start = float(argv[2]) if len(argv) > 2 else None
+	t_end = float(argv[3]) if len(argv) > 3 else None
+	
+	manifest = read_manifest(src)
+	key = manifest["time_key"]
+	
+	n = 0
+	with open(dst, "w", newline="") as f:
+		writer = csv.DictWriter(f, fieldnames=manifest["columns"])
+		writer.writeheader()
+		for row in iter_segment_rows(src, t_start, t_end):
+			t = float(row[key]) if row.get(key) else None
+			if t is not None and ((t_start is not None and t < t_start) or (t_end is not None and t > t_end)):
+				continue
+			writer.writerow(row)
+			n += 1
+	
+	print(f"[EXPORT] {n} rows -> {dst}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
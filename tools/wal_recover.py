@@ -0,0 +1,30 @@
+# tools/wal_recover.py
+#
+# Rebuilds a DataLogger CSV from its write-ahead log (.wal) after a crash.
+# Usage: python -m tools.wal_recover logs/BrakeTest_02.csv.wal[.<date-time>] [out.csv]
+
+import os
+import sys
+
+from storage.wal import recover_csv
+
+
+def main(argv):
+	
+	if not argv:
+		print("Usage: python -m tools.wal_recover <file.wal> [out.csv]")
+		return 1
+	
+	src = argv[0]
+	# <save_file>.wal, or <save_file>.wal.<date-time> when kept aside by a later run
+	base, _, stamp = src.partition(".wal")
+	suffix = f"_{stamp.lstrip('.')}" if stamp else ""
+	dst = argv[1] if len(argv) > 1 else f"{os.path.splitext(base)[0]}{suffix}_recovered.csv"
+	
+	n = recover_csv(src, dst)
+	print(f"[RECOVER] {n} rows -> {dst}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))